@@ -0,0 +1,92 @@
+"""
+Time EPUB chapter text export against a BeautifulSoup baseline.
+
+    python benchmarks/bench_epub_text.py --chapters 200 --paragraphs 400 --jobs 1 4
+
+The baseline parses each chapter's XHTML with BeautifulSoup's html.parser
+tree builder and writes get_text() one chapter at a time. split_epub then
+converts the same chapters to text and Markdown with the libxml2-based
+converter, with each --jobs value. Each row is the fastest of --repeat runs.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+from corpus import make_epub
+
+from pdfsplitter.core.epub_archive import EpubArchive
+from pdfsplitter.core.epub_processor import plan_epub_chapters, split_epub
+
+
+def bs4_export(epub_path: Path, output_dir: Path) -> int:
+    with EpubArchive(epub_path) as archive:
+        chapters = plan_epub_chapters(archive)
+        for i, chapter in enumerate(chapters):
+            texts = []
+            for n in range(chapter.start_page, chapter.end_page + 1):
+                soup = BeautifulSoup(
+                    archive.read(archive.spine[n].member), "html.parser"
+                )
+                texts.append(soup.get_text("\n", strip=True))
+            (output_dir / f"chapter_{i + 1:02d}.txt").write_text("\n\n".join(texts))
+    return len(chapters)
+
+
+def best_of(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="bench_epub_text_") as output_dir:
+            start = time.perf_counter()
+            fn(Path(output_dir))
+            times.append(time.perf_counter() - start)
+    return round(min(times), 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=Path("benchmarks/.corpus"))
+    parser.add_argument("--chapters", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=400)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    args.corpus.mkdir(parents=True, exist_ok=True)
+    path = args.corpus / f"book_{args.chapters}ch_{args.paragraphs}p.epub"
+    if not path.exists():
+        make_epub(path, args.chapters, args.paragraphs)
+
+    runs = [("bs4 html.parser", 1, lambda out: bs4_export(path, out))]
+    for output_format in ("text", "markdown"):
+        for jobs in args.jobs:
+            runs.append(
+                (
+                    f"split_epub {output_format}",
+                    jobs,
+                    lambda out, f=output_format, j=jobs: split_epub(
+                        path, out, output_format=f, jobs=j
+                    ),
+                )
+            )
+
+    results = []
+    baseline = None
+    print(f"{path.name}")
+    print(f"{'converter':<24}{'jobs':>6}{'seconds':>10}{'speedup':>10}")
+    for name, jobs, fn in runs:
+        seconds = best_of(fn, args.repeat)
+        baseline = baseline or seconds
+        results.append({"converter": name, "jobs": jobs, "seconds": seconds})
+        print(f"{name:<24}{jobs:>6}{seconds:>10.3f}{baseline / seconds:>9.1f}x")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Compare sequential and concurrent OCR classification against a local stand-in
+for the chat completions API.
+
+    python benchmarks/bench_llm_classify.py --docs 200 --latency-ms 100
+
+The stand-in answers YES for documents whose sample contains "<scan>" and NO
+otherwise, after a fixed delay, so every result can be checked for ordering.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][0]["content"]
+            time.sleep(latency)
+            answer = "YES" if "<scan>" in prompt else "NO"
+            payload = json.dumps(
+                {
+                    "id": "stand-in",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "finish_reason": "stop",
+                            "message": {"role": "assistant", "content": answer},
+                        }
+                    ],
+                }
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--sequential-docs", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stand-in")
+    os.environ["LLM_BASE_URL"] = base_url
+    from pdfsplitter.utils.llm import analyze_for_ocr, analyze_many_for_ocr
+
+    samples = [
+        [f"[Page 1]:\ndocument {i} {'<scan>' if i % 3 == 0 else '<text>'}"]
+        for i in range(args.docs)
+    ]
+    expected = [i % 3 == 0 for i in range(args.docs)]
+
+    results = []
+    count = min(args.sequential_docs, args.docs)
+    start = time.perf_counter()
+    sequential = [analyze_for_ocr(s) for s in samples[:count]]
+    elapsed = time.perf_counter() - start
+    results.append(
+        {
+            "mode": "sequential",
+            "docs": count,
+            "seconds": round(elapsed, 3),
+            "docs_per_second": round(count / elapsed, 1),
+            "correct": [r for r, _ in sequential] == expected[:count],
+        }
+    )
+
+    for concurrency in args.concurrency:
+        start = time.perf_counter()
+        batch = analyze_many_for_ocr(samples, concurrency, base_url)
+        elapsed = time.perf_counter() - start
+        results.append(
+            {
+                "mode": f"async x{concurrency}",
+                "docs": args.docs,
+                "seconds": round(elapsed, 3),
+                "docs_per_second": round(args.docs / elapsed, 1),
+                "correct": [r for r, _ in batch] == expected,
+            }
+        )
+
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'mode':<14}{'docs':>8}{'seconds':>10}{'docs/s':>10}{'correct':>10}")
+        for r in results:
+            print(
+                f"{r['mode']:<14}{r['docs']:>8}{r['seconds']:>10}"
+                f"{r['docs_per_second']:>10}{str(r['correct']):>10}"
+            )
+
+    if not all(r["correct"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Peak RSS of split_pdf as page count grows, with and without --page-window.
+
+    python benchmarks/bench_memory.py --pages 1000 5000 20000 --window 0 500
+
+Every run happens in a fresh process, since peak RSS is a per-process
+high-water mark. The corpus uses no TOC so detection reads every page, and a
+share of image-only pages like a scan. With a window, peak RSS should stay
+roughly flat as the page count grows.
+"""
+
+import argparse
+import json
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import PdfSpec, make_pdf
+
+from pdfsplitter.constants import PDF_WRITERS
+
+
+def run_split(pdf_path: str, writer: str, window: int, queue):
+    from pdfsplitter.core.pdf_processor import split_pdf
+    from pdfsplitter.utils.profiling import peak_rss_mb
+
+    with tempfile.TemporaryDirectory(prefix="bench_memory_") as output_dir:
+        start = time.perf_counter()
+        result = split_pdf(
+            Path(pdf_path), Path(output_dir), writer=writer, window=window or None
+        )
+        seconds = time.perf_counter() - start
+    queue.put(
+        {
+            "seconds": round(seconds, 2),
+            "sections": len(result.chapters),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+    )
+
+
+def measure(pdf_path: Path, writer: str, window: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_split, args=(str(pdf_path), writer, window, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=Path("benchmarks/.corpus"))
+    parser.add_argument("--pages", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--window", type=int, nargs="+", default=[0, 500])
+    parser.add_argument("--writer", nargs="+", choices=PDF_WRITERS, default=["fitz"])
+    parser.add_argument("--image-ratio", type=float, default=0.3)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    args.corpus.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    print(f"{'document':<40}{'writer':>8}{'window':>8}{'seconds':>10}{'peak MB':>10}")
+    for pages in args.pages:
+        spec = PdfSpec(pages, "none", image_ratio=args.image_ratio)
+        path = args.corpus / spec.name
+        if not path.exists():
+            make_pdf(spec, path)
+
+        for writer in args.writer:
+            for window in args.window:
+                run = measure(path, writer, window)
+                results.append(
+                    {
+                        "document": spec.name,
+                        "pages": pages,
+                        "writer": writer,
+                        "window": window,
+                        **run,
+                    }
+                )
+                print(
+                    f"{spec.name:<40}{writer:>8}{window:>8}"
+                    f"{run['seconds']:>10.2f}{run['peak_rss_mb']:>10.1f}"
+                )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Time each stage of split_pdf, needs_ocr and split_epub over a synthetic corpus.
+
+    python benchmarks/bench_pipeline.py --pages 10 1000 20000 --output results.json
+    python benchmarks/bench_pipeline.py --output new.json --compare results.json
+
+Corpus files are generated into --corpus on first use and reused afterwards.
+The LLM round-trip in needs_ocr is replaced by a fixed "no answer" so only
+local work is timed. Each stage reports the fastest of --repeat runs.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from corpus import TOC_MODES, PdfSpec, make_epub, make_pdf
+
+import pdfsplitter
+from pdfsplitter.core import ocr_detector
+from pdfsplitter.core.epub_processor import split_epub
+from pdfsplitter.core.pdf_processor import (
+    detect_chapter_candidates,
+    plan_sections,
+    write_metadata,
+)
+from pdfsplitter.core.session import DocumentSession
+from pdfsplitter.core.writers import get_writer, write_chapters
+
+
+def _skip_llm(text_samples):
+    return None, "LLM skipped in benchmark"
+
+
+def time_pdf(pdf_path: Path) -> tuple[dict, int]:
+    stages = {}
+
+    def timed(name, fn, *args):
+        start = time.perf_counter()
+        value = fn(*args)
+        stages[name] = time.perf_counter() - start
+        return value
+
+    with tempfile.TemporaryDirectory(prefix="bench_split_") as tmp:
+        output_dir = Path(tmp)
+        session = timed("open", DocumentSession, pdf_path)
+        with session:
+            candidates = timed("detect", detect_chapter_candidates, session)
+            chapters = timed("plan", plan_sections, session, candidates, output_dir)
+            timed("write", write_chapters, session, get_writer("fitz"), chapters)
+            timed(
+                "metadata",
+                write_metadata,
+                output_dir,
+                session.path,
+                session.page_count,
+                chapters,
+            )
+    stages["split_total"] = sum(stages.values())
+    timed("needs_ocr", ocr_detector.needs_ocr, pdf_path)
+    return stages, len(chapters)
+
+
+def time_epub(epub_path: Path) -> tuple[dict, int]:
+    with tempfile.TemporaryDirectory(prefix="bench_epub_") as output_dir:
+        start = time.perf_counter()
+        result = split_epub(epub_path, Path(output_dir))
+        return {"split_epub": time.perf_counter() - start}, len(result.chapters)
+
+
+def best_of(fn, path: Path, repeat: int) -> tuple[dict, int]:
+    runs = [fn(path) for _ in range(repeat)]
+    stages = {name: round(min(r[0][name] for r in runs), 4) for name in runs[0][0]}
+    return stages, runs[0][1]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(
+    results: dict, baseline_path: Path, threshold: float, min_seconds: float
+) -> list[str]:
+    baseline = json.loads(baseline_path.read_text())
+    before = {
+        (r["document"], stage): seconds
+        for r in baseline["results"]
+        for stage, seconds in r["stages"].items()
+    }
+
+    regressions = []
+    print(f"\nvs {baseline_path} ({baseline.get('git') or 'unknown revision'})")
+    for r in results["results"]:
+        for stage, seconds in r["stages"].items():
+            old = before.get((r["document"], stage))
+            # Stages this short are dominated by timer and scheduling noise.
+            if not old or old < min_seconds:
+                continue
+            ratio = seconds / old
+            flag = ""
+            if ratio > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{r['document']} {stage}")
+            print(
+                f"{r['document']:<40}{stage:<12}{old:>9.4f}{seconds:>9.4f}"
+                f"{ratio:>8.2f}x{flag}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=Path("benchmarks/.corpus"))
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 200, 2000])
+    parser.add_argument("--toc", nargs="+", choices=TOC_MODES, default=list(TOC_MODES))
+    parser.add_argument("--offset", type=int, nargs="+", default=[0])
+    parser.add_argument("--image-ratio", type=float, nargs="+", default=[0.0])
+    parser.add_argument("--epub-chapters", type=int, nargs="+", default=[20, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline results to diff")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown ratio reported as a regression",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.05,
+        help="Ignore stages faster than this in the baseline when comparing",
+    )
+    args = parser.parse_args()
+
+    ocr_detector.analyze_for_ocr = _skip_llm
+    args.corpus.mkdir(parents=True, exist_ok=True)
+
+    results = []
+    for pages in args.pages:
+        for toc in args.toc:
+            for offset in args.offset:
+                for image_ratio in args.image_ratio:
+                    spec = PdfSpec(pages, toc, offset, image_ratio)
+                    path = args.corpus / spec.name
+                    if not path.exists():
+                        make_pdf(spec, path)
+                    stages, sections = best_of(time_pdf, path, args.repeat)
+                    results.append(
+                        {
+                            "document": spec.name,
+                            "pages": pages,
+                            "toc": toc,
+                            "offset": offset,
+                            "image_ratio": image_ratio,
+                            "sections": sections,
+                            "stages": stages,
+                        }
+                    )
+
+    for chapters in args.epub_chapters:
+        path = args.corpus / f"book_{chapters}ch.epub"
+        if not path.exists():
+            make_epub(path, chapters)
+        stages, sections = best_of(time_epub, path, args.repeat)
+        results.append(
+            {
+                "document": path.name,
+                "chapters": chapters,
+                "sections": sections,
+                "stages": stages,
+            }
+        )
+
+    report = {
+        "version": pdfsplitter.__version__,
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+    stage_names = ["open", "detect", "plan", "write", "split_total", "needs_ocr"]
+    print(f"{'document':<40}" + "".join(f"{s:>12}" for s in stage_names))
+    for r in results:
+        cells = "".join(
+            f"{r['stages'][s]:>12.4f}" if s in r["stages"] else f"{'':>12}"
+            for s in stage_names
+        )
+        if "split_epub" in r["stages"]:
+            cells = f"{'split_epub':>12}{r['stages']['split_epub']:>12.4f}"
+        print(f"{r['document']:<40}{cells}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.compare and compare(report, args.compare, args.threshold, args.min_seconds):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
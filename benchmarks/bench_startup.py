@@ -0,0 +1,153 @@
+"""
+Measure CLI startup: import time of the entry module and `--help` wall time.
+
+    python benchmarks/bench_startup.py --runs 5 --max-ms 300
+
+Every run is a fresh interpreter. The script exits non-zero if the median
+import time exceeds --max-ms or a heavy dependency is imported at startup.
+It also splits a small EPUB through process_file and fails if that run
+loads any of the PDF stack (fitz, PyPDF2, openai).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from corpus import make_epub
+
+HEAVY_MODULES = (
+    "fitz",
+    "openai",
+    "PyPDF2",
+    "ebooklib",
+    "bs4",
+    "lxml",
+    "pydantic_settings",
+)
+# Only PDF splitting needs these; an EPUB run must not import them.
+PDF_MODULES = ("fitz", "PyPDF2", "openai")
+
+EPUB_RUN = """
+import sys
+from pathlib import Path
+from pdfsplitter.pipeline import process_file
+process_file(Path(sys.argv[1]), Path(sys.argv[2]))
+"""
+
+
+def _imported(stderr: str) -> dict[str, int]:
+    # -X importtime writes "self | cumulative | name" lines to stderr.
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:") :].split("|")]
+        if parts[1].isdigit():
+            cumulative[parts[2]] = int(parts[1])
+    return cumulative
+
+
+def import_time_ms(module: str) -> tuple[float, list[str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = _imported(proc.stderr)
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+    return loaded.get(module, 0) / 1000, heavy
+
+
+def epub_run_ms(epub_path: Path) -> tuple[float, list[str]]:
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as output_dir:
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", EPUB_RUN, epub_path, output_dir],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+    loaded = _imported(proc.stderr)
+    return elapsed, [m for m in PDF_MODULES if m in loaded]
+
+
+def help_time_ms(module: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", module, "--help"],
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="pdfsplitter.cli")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--corpus", type=Path, default=Path("benchmarks/.corpus"))
+    parser.add_argument("--max-ms", type=float, help="Fail above this import time")
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results")
+    args = parser.parse_args()
+
+    # Startup must not depend on credentials being configured.
+    os.environ.pop("OPENROUTER_API_KEY", None)
+
+    imports, heavy = [], set()
+    for _ in range(args.runs):
+        ms, loaded = import_time_ms(args.module)
+        imports.append(ms)
+        heavy.update(loaded)
+    helps = [help_time_ms(args.module) for _ in range(args.runs)]
+
+    args.corpus.mkdir(parents=True, exist_ok=True)
+    epub_path = args.corpus / "book_20ch_40p.epub"
+    if not epub_path.exists():
+        make_epub(epub_path, 20, 40)
+    epub_runs, pdf_loaded = [], set()
+    for _ in range(args.runs):
+        ms, loaded = epub_run_ms(epub_path)
+        epub_runs.append(ms)
+        pdf_loaded.update(loaded)
+
+    result = {
+        "module": args.module,
+        "runs": args.runs,
+        "import_ms_median": round(statistics.median(imports), 1),
+        "import_ms_min": round(min(imports), 1),
+        "help_ms_median": round(statistics.median(helps), 1),
+        "heavy_modules_loaded": sorted(heavy),
+        "epub_run_ms_median": round(statistics.median(epub_runs), 1),
+        "epub_run_pdf_modules_loaded": sorted(pdf_loaded),
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"import {args.module}: {result['import_ms_median']} ms (median)")
+        print(f"{args.module} --help: {result['help_ms_median']} ms (median)")
+        print(
+            f"EPUB split via process_file: {result['epub_run_ms_median']} ms (median)"
+        )
+        if heavy:
+            print(f"heavy modules imported at startup: {', '.join(sorted(heavy))}")
+        if pdf_loaded:
+            print(
+                f"PDF modules imported by the EPUB run: {', '.join(sorted(pdf_loaded))}"
+            )
+
+    too_slow = args.max_ms is not None and result["import_ms_median"] > args.max_ms
+    if heavy or pdf_loaded or too_slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
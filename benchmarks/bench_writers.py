@@ -0,0 +1,121 @@
+"""
+Compare chapter writer backends on throughput, peak memory and output size.
+
+    python benchmarks/bench_writers.py [book.pdf] --chapter-pages 20
+
+Each backend runs in a fresh process so peak RSS is not shared between them.
+Without an input file a synthetic book is generated first.
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+
+from pdfsplitter.core.session import DocumentSession
+from pdfsplitter.core.writers import WRITERS, get_writer
+
+
+def make_sample_pdf(path: Path, pages: int = 600):
+    # One shared font and image resource referenced from every page, which is
+    # the case where per-page copying duplicates the most data.
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 256, 256), 0)
+    pixmap.set_rect(pixmap.irect, (90, 120, 200))
+    image = pixmap.tobytes("png")
+
+    with fitz.open() as doc:
+        for page_num in range(pages):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"CHAPTER {page_num // 20 + 1}", fontsize=20)
+            for line in range(30):
+                page.insert_text(
+                    (72, 110 + line * 20),
+                    f"Page {page_num + 1} line {line + 1} of synthetic body text.",
+                )
+            page.insert_image(fitz.Rect(300, 600, 500, 800), stream=image)
+        doc.save(path, garbage=3, deflate=True)
+
+
+def max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux.
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_backend(name: str, pdf_path: str, chapter_pages: int, queue):
+    writer = get_writer(name)
+    baseline_rss = max_rss_mb()
+
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as tmp:
+        output_dir = Path(tmp)
+        start = time.perf_counter()
+        with DocumentSession(Path(pdf_path)) as session:
+            total_pages = session.page_count
+            for i, first in enumerate(range(0, total_pages, chapter_pages)):
+                last = min(first + chapter_pages, total_pages) - 1
+                writer.write(
+                    session, first, last, output_dir / f"chapter_{i + 1:02d}.pdf"
+                )
+        elapsed = time.perf_counter() - start
+        output_bytes = sum(f.stat().st_size for f in output_dir.glob("*.pdf"))
+
+    queue.put(
+        {
+            "backend": name,
+            "pages": total_pages,
+            "seconds": round(elapsed, 3),
+            "pages_per_second": round(total_pages / elapsed, 1),
+            "peak_rss_mb": round(max_rss_mb(), 1),
+            "rss_growth_mb": round(max_rss_mb() - baseline_rss, 1),
+            "output_bytes": output_bytes,
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", nargs="?", type=Path)
+    parser.add_argument("--pages", type=int, default=600)
+    parser.add_argument("--chapter-pages", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=list(WRITERS))
+    parser.add_argument("--json", action="store_true", help="Print raw JSON results")
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_src_") as source_dir:
+        pdf_path = args.input
+        if pdf_path is None:
+            pdf_path = Path(source_dir) / "sample.pdf"
+            make_sample_pdf(pdf_path, args.pages)
+
+        for name in args.backends:
+            queue = ctx.Queue()
+            proc = ctx.Process(
+                target=run_backend,
+                args=(name, str(pdf_path), args.chapter_pages, queue),
+            )
+            proc.start()
+            results.append(queue.get())
+            proc.join()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'backend':<10}{'pages/s':>10}{'seconds':>10}{'peak MB':>10}{'out MB':>10}")
+    for r in results:
+        print(
+            f"{r['backend']:<10}{r['pages_per_second']:>10}{r['seconds']:>10}"
+            f"{r['peak_rss_mb']:>10}{r['output_bytes'] / 1e6:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
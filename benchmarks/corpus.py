@@ -0,0 +1,218 @@
+"""
+Generate synthetic PDF and EPUB books for the benchmarks.
+
+    python benchmarks/corpus.py corpus/ --pages 10 1000 20000 --toc outline text none
+
+Chapters open with a "CHAPTER N" heading. TOC page numbers are printed
+`offset` pages lower than the physical page, as in books whose numbering
+starts after the front matter. A share of body pages holds only an image,
+like a scanned insert. With --running-header every page after the first
+carries the book title at the top, and chapter headings sit a third of
+the way down the page, below the header region.
+"""
+
+import argparse
+import bisect
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import fitz
+
+TOC_MODES = ("outline", "text", "none")
+TOC_LINES_PER_PAGE = 30
+
+BODY_LINES = "\n".join(
+    f"Line {n} of synthetic body text, long enough to look like real prose."
+    for n in range(1, 31)
+)
+# Chapter openings are drawn directly so the heading comes first in page text.
+OPENING_LINES = "\n".join(BODY_LINES.split("\n")[:12])
+RUNNING_HEADER = "A Synthetic Book"
+# Baseline of a lowered chapter heading: below HEADER_REGION of the page.
+LOW_HEADING_Y = 340
+
+
+@dataclass
+class PdfSpec:
+    pages: int
+    toc: str = "outline"
+    offset: int = 0
+    image_ratio: float = 0.0
+    chapter_pages: int = 20
+    front_pages: int = 4
+    back_pages: int = 6
+    seed: int = 0
+    running_header: bool = False
+
+    @property
+    def name(self) -> str:
+        return (
+            f"book_{self.pages}p_{self.toc}_off{self.offset}"
+            f"_img{round(self.image_ratio * 100)}"
+            f"{'_header' if self.running_header else ''}.pdf"
+        )
+
+
+CHUNK_PAGES = 200
+
+
+def _templates() -> fitz.Document:
+    # Page 0 holds the body text, page 1 a full-page image. Copying these is
+    # far cheaper than drawing text on every page of a 20k-page book.
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), 0)
+    pixmap.set_rect(pixmap.irect, (180, 180, 170))
+
+    templates = fitz.open()
+    templates.new_page().insert_text((72, 110), BODY_LINES)
+    page = templates.new_page()
+    page.insert_image(page.rect, stream=pixmap.tobytes("png"))
+    return templates
+
+
+def _layout(spec: PdfSpec) -> tuple[int, list[int]]:
+    # Body pages left after front and back matter, split into chapter starts.
+    chapters = max(
+        1, (spec.pages - spec.front_pages - spec.back_pages) // spec.chapter_pages
+    )
+    toc_pages = -(-chapters // TOC_LINES_PER_PAGE) if spec.toc == "text" else 1
+    front = max(spec.front_pages, toc_pages + 1, spec.offset)
+    body = max(chapters, spec.pages - front - spec.back_pages)
+    per_chapter = max(1, body // chapters)
+    starts = [front + i * per_chapter for i in range(chapters)]
+    return front, starts
+
+
+def _page_content(
+    spec: PdfSpec, page_num: int, front: int, starts: list[int], rng: random.Random
+) -> tuple[Optional[int], str]:
+    """Template page to copy (None for blank) and the text to draw on top."""
+    body_end = max(spec.pages - spec.back_pages, starts[-1] + 1)
+
+    if page_num == 0:
+        return None, "A Synthetic Book"
+    if page_num < front:
+        if spec.toc != "text":
+            return None, "Contents"
+        first = (page_num - 1) * TOC_LINES_PER_PAGE
+        last = min(first + TOC_LINES_PER_PAGE, len(starts))
+        return None, "\n".join(
+            ["Contents"]
+            + [
+                f"{n}. Topic number {n} {starts[n - 1] + 1 - spec.offset}"
+                for n in range(first + 1, last + 1)
+            ]
+        )
+    if page_num == body_end:
+        return None, "REFERENCES"
+    if page_num > body_end:
+        return 0, ""
+
+    chapter = bisect.bisect_right(starts, page_num)
+    if chapter and starts[chapter - 1] == page_num:
+        return None, f"CHAPTER {chapter}\n\n{OPENING_LINES}"
+    if rng.random() < spec.image_ratio:
+        return 1, ""
+    return 0, ""
+
+
+def make_pdf(spec: PdfSpec, path: Path) -> Path:
+    if spec.toc not in TOC_MODES:
+        raise ValueError(f"Unknown TOC mode: {spec.toc}")
+
+    rng = random.Random(spec.seed)
+    front, starts = _layout(spec)
+    total = max(spec.pages, starts[-1] + 2)
+
+    # Appending to a large document costs time proportional to its page count,
+    # so pages are built in small chunks that are then appended whole.
+    with _templates() as templates, fitz.open() as doc:
+        for chunk_start in range(0, total, CHUNK_PAGES):
+            with fitz.open() as chunk:
+                for page_num in range(
+                    chunk_start, min(chunk_start + CHUNK_PAGES, total)
+                ):
+                    template, text = _page_content(spec, page_num, front, starts, rng)
+                    if template is None:
+                        page = chunk.new_page()
+                    else:
+                        chunk.insert_pdf(
+                            templates, from_page=template, to_page=template
+                        )
+                        page = chunk[-1]
+                    if spec.running_header and page_num:
+                        page.insert_text((72, 36), RUNNING_HEADER)
+                        if text.startswith("CHAPTER"):
+                            page.insert_text((72, LOW_HEADING_Y), text)
+                            continue
+                    if text:
+                        page.insert_text((72, 72), text)
+                doc.insert_pdf(chunk)
+
+        if spec.toc == "outline":
+            doc.set_toc(
+                [
+                    [1, f"Chapter {n}", page + 1 - spec.offset]
+                    for n, page in enumerate(starts, 1)
+                ]
+            )
+
+        doc.save(path, garbage=1, deflate=True)
+    return path
+
+
+def make_epub(path: Path, chapters: int = 20, paragraphs: int = 40) -> Path:
+    from ebooklib import epub
+
+    book = epub.EpubBook()
+    book.set_identifier(f"synthetic-{chapters}-{paragraphs}")
+    book.set_title("A Synthetic Book")
+    book.set_language("en")
+
+    items = []
+    for n in range(1, chapters + 1):
+        item = epub.EpubHtml(title=f"Chapter {n}", file_name=f"chap_{n:03d}.xhtml")
+        body = "".join(
+            f"<p>Paragraph {p} of chapter {n}, with some synthetic body text.</p>"
+            for p in range(paragraphs)
+        )
+        item.content = f"<h1>Chapter {n}</h1>{body}"
+        book.add_item(item)
+        items.append(item)
+
+    book.toc = items
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.spine = ["nav", *items]
+    epub.write_epub(str(path), book)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 200, 2000])
+    parser.add_argument("--toc", nargs="+", choices=TOC_MODES, default=list(TOC_MODES))
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--image-ratio", type=float, default=0.0)
+    parser.add_argument("--running-header", action="store_true")
+    parser.add_argument("--epub-chapters", type=int, default=20)
+    args = parser.parse_args()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    for pages in args.pages:
+        for toc in args.toc:
+            spec = PdfSpec(
+                pages,
+                toc,
+                args.offset,
+                args.image_ratio,
+                running_header=args.running_header,
+            )
+            print(make_pdf(spec, args.output_dir / spec.name))
+    print(make_epub(args.output_dir / "book.epub", args.epub_chapters))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 __version__ = "1.0.0"
 __author__ = "PDFSplitter"
 
-from .cli import main
-
 __all__ = ["main", "__version__"]
+
+
+def __getattr__(name: str):
+    # Imported on first use so `import pdfsplitter` stays cheap.
+    if name == "main":
+        from .cli import main
+
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
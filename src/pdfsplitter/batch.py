@@ -0,0 +1,289 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+from tqdm import tqdm
+from .config import settings
+from .constants import OCR_CLASSIFY_CHUNK, OUTPUT_DIR_SUFFIX
+from .core.heading_rules import register_rule_set
+from .core.ocr_detector import needs_ocr_many
+from .pipeline import SUPPORTED_SUFFIXES, process_file
+from .utils import Cache, open_cache, setup_logging, get_logger
+from .utils.fingerprint import file_sha256
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class BatchSummary:
+    processed: int = 0
+    skipped: int = 0
+    failed: list[str] = field(default_factory=list)
+
+
+def is_split_output(directory: Path) -> bool:
+    """Whether directory holds the metadata.json of an earlier split."""
+    try:
+        metadata = json.loads((directory / "metadata.json").read_text())
+    except (OSError, ValueError):
+        return False
+    return (
+        isinstance(metadata, dict)
+        and "original_file" in metadata
+        and "chapters" in metadata
+    )
+
+
+def discover_inputs(directory: Path, output_root: Optional[Path] = None) -> list[Path]:
+    """
+    Books under directory, leaving out the chapter files of earlier splits
+    and anything under output_root, so a rerun only finds the originals.
+    """
+    skip = output_root.resolve() if output_root is not None else None
+    inputs = []
+    for root, dirs, files in os.walk(directory):
+        root = Path(root)
+        books = [
+            root / name
+            for name in files
+            if Path(name).suffix.lower() in SUPPORTED_SUFFIXES
+        ]
+        # A split killed before writing metadata.json leaves only chapter
+        # files, so the default output directory of a book found here is
+        # skipped too; other directories ending in the suffix are searched.
+        outputs = {f"{book.stem}{OUTPUT_DIR_SUFFIX}" for book in books}
+        dirs[:] = sorted(
+            d
+            for d in dirs
+            if d not in outputs
+            and (root / d).resolve() != skip
+            and not is_split_output(root / d)
+        )
+        inputs.extend(books)
+    return sorted(inputs)
+
+
+def read_file_list(list_path: Path) -> list[Path]:
+    inputs = []
+    for line in list_path.read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            inputs.append(Path(line))
+    return inputs
+
+
+def batch_output_dir(
+    input_file: Path, output_root: Optional[Path], base_dir: Optional[Path] = None
+) -> Path:
+    if output_root is None:
+        return input_file.parent / f"{input_file.stem}{OUTPUT_DIR_SUFFIX}"
+
+    relative_parent = Path()
+    if base_dir is not None:
+        try:
+            relative_parent = input_file.parent.relative_to(base_dir)
+        except ValueError:
+            pass
+    return output_root / relative_parent / f"{input_file.stem}{OUTPUT_DIR_SUFFIX}"
+
+
+def _file_state(path: Path) -> dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_manifest(manifest_path: Path) -> dict[str, dict]:
+    records = {}
+    if not manifest_path.exists():
+        return records
+
+    for line in manifest_path.read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            # A run killed mid-write can leave a truncated last line.
+            continue
+        records[record["input"]] = record
+    return records
+
+
+def is_done(record: Optional[dict], input_file: Path) -> bool:
+    if not record or record.get("status") != "done":
+        return False
+    try:
+        state = _file_state(input_file)
+    except OSError:
+        return False
+    return (
+        record.get("size") == state["size"]
+        and record.get("mtime_ns") == state["mtime_ns"]
+    )
+
+
+_worker_cache: Optional[Cache] = None
+
+
+def _init_worker(
+    cache_backend: Optional[str], log_level: str, heading_rules: tuple[str, ...] = ()
+):
+    global _worker_cache
+    setup_logging(log_level)
+    for name in heading_rules:
+        register_rule_set(name)
+    _worker_cache = (
+        open_cache(cache_backend, settings.CACHE_DIR, settings.CACHE_MAX_BYTES)
+        if cache_backend
+        else None
+    )
+
+
+def _process_one(
+    input_file: Path, output_dir: Path, options: dict, sha256: Optional[str] = None
+) -> dict:
+    record = {"input": str(input_file), "output_dir": str(output_dir)}
+    start = time.perf_counter()
+
+    try:
+        record.update(_file_state(input_file))
+        result = process_file(
+            input_file, output_dir, _worker_cache, sha256=sha256, **options
+        )
+        record.update(status="done", chapters=len(result.chapters), error=None)
+    except Exception as e:
+        logger.error(f"Processing failed for {input_file}: {e}")
+        record.update(status="failed", chapters=0, error=str(e))
+
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    record["finished_at"] = datetime.now(timezone.utc).isoformat()
+    return record
+
+
+def classify_pending(
+    inputs: list[Path], cache: Optional[Cache], fast_fingerprint: bool = False
+) -> dict[Path, str]:
+    """
+    Settle the OCR decisions of the PDFs in inputs with one concurrent LLM
+    pass, so workers find them in the shared cache instead of asking one
+    file at a time. Returns the SHA-256 of every PDF hashed for its cache
+    key, for the worker to reuse.
+    """
+    pdfs = [p for p in inputs if p.suffix.lower() == ".pdf"]
+    if cache is None or not pdfs:
+        return {}
+
+    start = time.perf_counter()
+    sha256s = {}
+    if not fast_fingerprint:
+        for pdf in pdfs:
+            try:
+                sha256s[pdf] = file_sha256(pdf)
+            except OSError:
+                continue
+    try:
+        needs_ocr_many(pdfs, cache, fast_fingerprint, sha256s=sha256s)
+    except Exception as e:
+        logger.warning(f"Batch OCR classification failed: {e}")
+        return sha256s
+    logger.info(
+        f"Classified {len(pdfs)} PDFs for OCR in {time.perf_counter() - start:.1f}s"
+    )
+    return sha256s
+
+
+def run_batch(
+    inputs: list[Path],
+    manifest_path: Path,
+    output_root: Optional[Path] = None,
+    base_dir: Optional[Path] = None,
+    workers: int = 1,
+    cache_backend: Optional[str] = "json",
+    log_level: str = "INFO",
+    heading_rules: tuple[str, ...] = (),
+    **options,
+) -> BatchSummary:
+    """
+    Process inputs, appending one manifest record per file. Extra keyword
+    arguments are passed to process_file for every file.
+    """
+    summary = BatchSummary()
+    done = load_manifest(manifest_path)
+
+    pending = []
+    for input_file in inputs:
+        if is_done(done.get(str(input_file)), input_file):
+            summary.skipped += 1
+        else:
+            pending.append(input_file)
+
+    logger.info(
+        f"Batch: {len(pending)} to process, {summary.skipped} already done "
+        f"(manifest: {manifest_path})"
+    )
+
+    cache = (
+        open_cache(cache_backend, settings.CACHE_DIR, settings.CACHE_MAX_BYTES)
+        if cache_backend
+        else None
+    )
+
+    def task_chunks():
+        # Classifying in chunks lets the first books start before the whole
+        # library has been read.
+        for first in range(0, len(pending), OCR_CLASSIFY_CHUNK):
+            chunk = pending[first : first + OCR_CLASSIFY_CHUNK]
+            sha256s = classify_pending(
+                chunk, cache, options.get("fast_fingerprint", False)
+            )
+            yield [
+                (
+                    input_file,
+                    batch_output_dir(input_file, output_root, base_dir),
+                    options,
+                    sha256s.get(input_file),
+                )
+                for input_file in chunk
+            ]
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, "a") as manifest:
+        with tqdm(total=len(pending), desc="Books", unit="file") as progress:
+
+            def record_result(record: dict):
+                manifest.write(json.dumps(record) + "\n")
+                manifest.flush()
+                os.fsync(manifest.fileno())
+
+                if record["status"] == "done":
+                    summary.processed += 1
+                else:
+                    summary.failed.append(record["input"])
+                progress.update(1)
+
+            if workers <= 1:
+                _init_worker(cache_backend, log_level, heading_rules)
+                for tasks in task_chunks():
+                    for task in tasks:
+                        record_result(_process_one(*task))
+            else:
+                # Each worker process keeps its imports and one Cache for all its files.
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(cache_backend, log_level, heading_rules),
+                ) as pool:
+                    futures = set()
+                    for tasks in task_chunks():
+                        futures.update(
+                            pool.submit(_process_one, *task) for task in tasks
+                        )
+                        for future in [f for f in futures if f.done()]:
+                            futures.remove(future)
+                            record_result(future.result())
+                    for future in as_completed(futures):
+                        record_result(future.result())
+
+    return summary
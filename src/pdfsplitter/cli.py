@@ -1,43 +1,37 @@
-import subprocess
 from pathlib import Path
 import click
-from .config import settings
-from .core import needs_ocr, split_pdf, split_epub
-from .utils import Cache, setup_logging, get_logger
+from .constants import (
+    CACHE_BACKENDS,
+    EPUB_FORMATS,
+    EPUB_RESOURCE_MODES,
+    EXTRA_HEADING_RULES,
+    MANIFEST_NAME,
+    OCR_MODES,
+    PDF_WRITERS,
+    TEXT_FORMATS,
+)
+from .utils.logging import setup_logging, get_logger
 import sys
 
 logger = get_logger(__name__)
 
 
 def run_ocr(input_path: Path, output_path: Path) -> bool:
-    try:
-        result = subprocess.run(
-            [
-                "ocrmypdf",
-                "--deskew",
-                "--clean",
-                "--optimize",
-                "3",
-                "-q",
-                str(input_path),
-                str(output_path),
-            ],
-            capture_output=True,
-            text=True,
-            timeout=settings.OCR_TIMEOUT,
-        )
+    from .core.ocr_runner import run_ocr as _run_ocr
 
-        return result.returncode == 0
-    except subprocess.TimeoutExpired:
-        logger.error("OCR timed out")
-        return False
-    except Exception as e:
-        logger.error(f"OCR failed: {e}")
-        return False
+    return _run_ocr(input_path, output_path)
+
+
+def _dump_stats(stats_profiler, path: Path):
+    stats_profiler.disable()
+    stats_profiler.dump_stats(path)
+    logger.info(f"cProfile stats written to {path}")
 
 
 @click.command()
-@click.argument("input_file", type=click.Path(exists=True, path_type=Path))
+@click.argument(
+    "input_file", required=False, type=click.Path(exists=True, path_type=Path)
+)
 @click.option(
     "--output-dir",
     "-o",
@@ -45,10 +39,259 @@ def run_ocr(input_path: Path, output_path: Path) -> bool:
     default=None,
     help="Output directory (default: <input>_output)",
 )
-@click.option("--cache/--no-cache", default=True, help="Use cache for OCR decisions")
+@click.option(
+    "--files-from",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Batch mode: process the files listed in this file, one per line",
+)
+@click.option(
+    "--manifest",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help=f"Batch manifest used to resume interrupted runs (default: {MANIFEST_NAME})",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Batch mode: files processed in parallel",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Cache OCR decisions and detected chapter plans",
+)
+@click.option(
+    "--cache-backend",
+    type=click.Choice(CACHE_BACKENDS),
+    default=None,
+    help="Cache storage: one JSON file per entry, or a shared SQLite file "
+    "(default: CACHE_BACKEND setting)",
+)
+@click.option(
+    "--fast-fingerprint/--full-fingerprint",
+    default=None,
+    help="Key the OCR cache on size, mtime and head/tail hashes instead of "
+    "hashing the whole file (default: FAST_FINGERPRINT setting)",
+)
+@click.option(
+    "--ocr-mode",
+    type=click.Choice(OCR_MODES),
+    default=None,
+    help="OCR the whole document, or only the pages without a text layer "
+    "(default: OCR_MODE setting)",
+)
+@click.option(
+    "--ocr-jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Parallel ocrmypdf processes, each OCRing one page-range shard "
+    "(default: OCR_JOBS setting)",
+)
+@click.option(
+    "--writer",
+    type=click.Choice(PDF_WRITERS),
+    default=None,
+    help="Backend used to write chapter PDFs (default: PDF_WRITER setting)",
+)
+@click.option(
+    "--garbage",
+    type=click.IntRange(0, 4),
+    default=None,
+    help="Garbage collection level for the fitz writer "
+    "(default: PDF_GARBAGE setting)",
+)
+@click.option(
+    "--deflate/--no-deflate",
+    default=None,
+    help="Compress streams in the fitz writer (default: PDF_DEFLATE setting)",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Worker processes used to write chapter files (PDFs, and EPUB "
+    "chapters converted to text or Markdown)",
+)
+@click.option(
+    "--page-window",
+    type=click.IntRange(min=0),
+    default=None,
+    help="Bound memory on very large PDFs by reopening the file every N pages "
+    "read or written; 0 keeps it open throughout (default: PAGE_WINDOW setting)",
+)
+@click.option(
+    "--index-only",
+    is_flag=True,
+    help="Write only metadata.json with each chapter's page range; chapter "
+    "PDFs are produced later on demand with pdfsplitter.core.materialize_chapter",
+)
+@click.option(
+    "--chapter-text",
+    type=click.Choice(tuple(TEXT_FORMATS)),
+    default=None,
+    help="Also write each PDF chapter's text as chapter_NN.txt or chapter_NN.md; "
+    "with --index-only the text files replace the chapter PDFs "
+    "(default: CHAPTER_TEXT setting)",
+)
+@click.option(
+    "--epub-format",
+    type=click.Choice(EPUB_FORMATS),
+    default=None,
+    help="Write EPUB chapters as XHTML, plain text (.txt) or Markdown (.md) "
+    "(default: EPUB_FORMAT setting)",
+)
+@click.option(
+    "--epub-resources",
+    type=click.Choice(EPUB_RESOURCE_MODES),
+    default=None,
+    help="EPUB images and stylesheets: one resources/ directory shared by all "
+    "chapters, or a copy per chapter in <chapter>_files/ "
+    "(default: EPUB_RESOURCES setting)",
+)
+@click.option(
+    "--extra-headings",
+    type=click.Choice(EXTRA_HEADING_RULES),
+    multiple=True,
+    help="Also treat these headings as chapter starts: CHAPTER IV (roman) or "
+    "PART 2 / PART II (part). Repeatable (default: EXTRA_HEADING_RULES setting)",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Write per-stage wall/CPU time, pages touched and peak memory to "
+    "profile.json next to metadata.json",
+)
+@click.option(
+    "--profile-stats",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Dump cProfile stats for the whole run to this file (view with pstats)",
+)
 @click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
-def main(input_file: Path, output_dir: Path, cache: bool, verbose: bool):
-    setup_logging("DEBUG" if verbose else "INFO")
+def main(
+    input_file: Path,
+    output_dir: Path,
+    files_from: Path,
+    manifest: Path,
+    workers: int,
+    cache: bool,
+    cache_backend: str,
+    fast_fingerprint: bool,
+    ocr_mode: str,
+    ocr_jobs: int,
+    writer: str,
+    garbage: int,
+    deflate: bool,
+    jobs: int,
+    page_window: int,
+    index_only: bool,
+    chapter_text: str,
+    epub_format: str,
+    epub_resources: str,
+    extra_headings: tuple[str, ...],
+    profile: bool,
+    profile_stats: Path,
+    verbose: bool,
+):
+    log_level = "DEBUG" if verbose else "INFO"
+    setup_logging(log_level)
+
+    if profile_stats is not None:
+        import cProfile
+
+        stats_profiler = cProfile.Profile()
+        stats_profiler.enable()
+        click.get_current_context().call_on_close(
+            lambda: _dump_stats(stats_profiler, profile_stats)
+        )
+
+    # Heavy modules load here so --help and usage errors stay fast.
+    from .config import settings
+    from .core.heading_rules import register_rule_set
+    from .core.writers import FitzWriter, get_writer
+    from .utils.cache import open_cache
+
+    def setting(value, name: str):
+        return getattr(settings, name) if value is None else value
+
+    cache_backend = setting(cache_backend, "CACHE_BACKEND")
+    fast_fingerprint = setting(fast_fingerprint, "FAST_FINGERPRINT")
+    ocr_mode = setting(ocr_mode, "OCR_MODE")
+    ocr_jobs = setting(ocr_jobs, "OCR_JOBS")
+    writer = setting(writer, "PDF_WRITER")
+    garbage = setting(garbage, "PDF_GARBAGE")
+    deflate = setting(deflate, "PDF_DEFLATE")
+    page_window = setting(page_window, "PAGE_WINDOW") or None
+    chapter_text = setting(chapter_text, "CHAPTER_TEXT") or None
+    epub_format = setting(epub_format, "EPUB_FORMAT")
+    epub_resources = setting(epub_resources, "EPUB_RESOURCES")
+    extra_headings = tuple(extra_headings or settings.EXTRA_HEADING_RULES)
+
+    for name in extra_headings:
+        register_rule_set(name)
+
+    pdf_writer = (
+        FitzWriter(garbage=garbage, deflate=deflate)
+        if writer == "fitz"
+        else get_writer(writer)
+    )
+
+    if input_file is None and files_from is None:
+        raise click.UsageError("Provide INPUT_FILE, a directory or --files-from")
+
+    if files_from is not None or input_file.is_dir():
+        from .batch import discover_inputs, read_file_list, run_batch
+
+        if files_from is not None:
+            inputs = read_file_list(files_from)
+            base_dir = None
+            default_root = files_from.parent
+        else:
+            inputs = discover_inputs(input_file, output_dir)
+            base_dir = input_file
+            default_root = input_file
+
+        manifest_path = manifest or (output_dir or default_root) / MANIFEST_NAME
+        summary = run_batch(
+            inputs,
+            manifest_path,
+            output_root=output_dir,
+            base_dir=base_dir,
+            workers=workers,
+            cache_backend=cache_backend if cache else None,
+            log_level=log_level,
+            heading_rules=extra_headings,
+            writer=pdf_writer,
+            jobs=jobs,
+            ocr_mode=ocr_mode,
+            ocr_jobs=ocr_jobs,
+            fast_fingerprint=fast_fingerprint,
+            profile=profile,
+            page_window=page_window,
+            index_only=index_only,
+            chapter_text=chapter_text,
+            epub_resources=epub_resources,
+            epub_format=epub_format,
+        )
+
+        click.echo("\n✓ Batch complete!")
+        click.echo(f"  Processed: {summary.processed}")
+        click.echo(f"  Skipped (already done): {summary.skipped}")
+        click.echo(f"  Failed: {len(summary.failed)}")
+        click.echo(f"  Manifest: {manifest_path}")
+
+        for failed in summary.failed:
+            click.echo(f"    ✗ {failed}")
+
+        if summary.failed:
+            sys.exit(1)
+        return
 
     if output_dir is None:
         output_dir = input_file.parent / f"{input_file.stem}_output"
@@ -57,35 +300,35 @@ def main(input_file: Path, output_dir: Path, cache: bool, verbose: bool):
     logger.info(f"Processing: {input_file}")
     logger.info(f"Output directory: {output_dir}")
 
-    cache_obj = Cache(settings.CACHE_DIR) if cache else None
+    from .pipeline import process_file
 
-    try:
-        if input_file.suffix.lower() == ".pdf":
-            needs, reasoning = needs_ocr(input_file, cache_obj)
-            logger.info(f"OCR decision: {reasoning}")
-
-            if needs:
-                logger.info("Scanned PDF detected, running OCR...")
-                ocr_path = input_file.with_stem(f"{input_file.stem}_ocr")
-                if run_ocr(input_file, ocr_path):
-                    result = split_pdf(ocr_path, output_dir)
-                    try:
-                        ocr_path.unlink()
-                    except OSError:
-                        pass
-                else:
-                    logger.warning("OCR failed, proceeding with original file")
-                    result = split_pdf(input_file, output_dir)
-            else:
-                result = split_pdf(input_file, output_dir)
-
-        elif input_file.suffix.lower() == ".epub":
-            result = split_epub(input_file, output_dir)
+    cache_obj = (
+        open_cache(cache_backend, settings.CACHE_DIR, settings.CACHE_MAX_BYTES)
+        if cache
+        else None
+    )
 
-        else:
-            raise click.UsageError(f"Unsupported file type: {input_file.suffix}")
+    try:
+        result = process_file(
+            input_file,
+            output_dir,
+            cache_obj,
+            writer=pdf_writer,
+            jobs=jobs,
+            ocr_mode=ocr_mode,
+            ocr_jobs=ocr_jobs,
+            fast_fingerprint=fast_fingerprint,
+            profile=profile,
+            page_window=page_window,
+            index_only=index_only,
+            chapter_text=chapter_text,
+            epub_resources=epub_resources,
+            epub_format=epub_format,
+        )
 
         logger.info(f"Successfully processed {len(result.chapters)} chapters")
+        if cache_obj is not None:
+            logger.debug(f"Cache stats: {cache_obj.stats()}")
 
         click.echo(f"\n✓ Processing complete!")
         click.echo(f"  Input: {input_file.name}")
@@ -95,6 +338,9 @@ def main(input_file: Path, output_dir: Path, cache: bool, verbose: bool):
         for i, chapter in enumerate(result.chapters):
             click.echo(f"    {i + 1:02d}. {chapter.title}")
 
+        if profile:
+            click.echo(f"  Profile: {output_dir / 'profile.json'}")
+
     except Exception as e:
         logger.error(f"Processing failed: {e}")
         raise click.ClickException(str(e))
@@ -10,10 +10,31 @@ load_dotenv(".env", override=True)
 class Settings(BaseSettings):
     OPENROUTER_API_KEY: str = ""
     MODEL_NAME: str = "nvidia/nemotron-3-nano-30b-a3b:free"
+    LLM_BASE_URL: str = "https://openrouter.ai/api/v1"
+    LLM_CONCURRENCY: int = 8
     SAMPLE_PAGES: int = 3
     OCR_TIMEOUT: int = 300
+    OCR_MODE: str = "full"
+    OCR_SHARD_PAGES: int = 50
+    OCR_JOBS: int = 4
+    OCR_RETRIES: int = 1
+    FAST_FINGERPRINT: bool = False
     CACHE_DIR: Path = Path.home() / ".cache" / "pdfsplitter"
+    CACHE_BACKEND: str = "json"
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
     LOG_LEVEL: str = "INFO"
+    PDF_WRITER: str = "fitz"
+    PDF_GARBAGE: int = 1
+    PDF_DEFLATE: bool = True
+    PAGE_WINDOW: int = 0
+    CHAPTER_TEXT: str = ""
+    EPUB_RESOURCES: str = "shared"
+    EPUB_FORMAT: str = "xhtml"
+    EXTRA_HEADING_RULES: list[str] = []
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8765
+    SERVER_WORKERS: int = 2
+    SERVER_QUEUE_SIZE: int = 64
 
     class Config:
         env_file = ".env"
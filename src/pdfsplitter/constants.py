@@ -4,6 +4,14 @@ import re
 PROJECT_NAME = "pdfsplitter"
 VERSION = "1.0.0"
 
+# Bump whenever a change to PDF chapter detection can change its output;
+# cached detection plans from other versions are then ignored.
+DETECTOR_VERSION = 5
+
+# Share of the page height, from the top, read for chapter and posttext
+# headings.
+HEADER_REGION = 0.35
+
 CHAPTER_PATTERNS = [
     re.compile(r"^CHAPTER\s+\d+$", re.IGNORECASE | re.MULTILINE),
     re.compile(r"^CHAPTER\s+[IVXLCDM]+$", re.IGNORECASE | re.MULTILINE),
@@ -13,6 +21,26 @@ CHAPTER_PATTERNS = [
     re.compile(r"^PART\s+[IVXLCDM]+$", re.IGNORECASE | re.MULTILINE),
 ]
 
+# Headings that open a chapter during text detection.
+CHAPTER_HEADING_PATTERNS = [
+    re.compile(r"^\s*(CHAPTER\s+\d+)\s*$", re.IGNORECASE | re.MULTILINE),
+]
+
+# Optional heading rule sets, enabled with core.heading_rules.register_rule_set.
+ROMAN_CHAPTER_PATTERNS = [
+    re.compile(r"^\s*CHAPTER\s+[IVXLCDM]+\s*$", re.IGNORECASE),
+]
+PART_HEADING_PATTERNS = [
+    re.compile(r"^\s*PART\s+(?:\d+|[IVXLCDM]+)\s*$", re.IGNORECASE),
+]
+
+POSTTEXT_HEADING_PATTERNS = [
+    re.compile(
+        r"^(?:REFERENCES|BIBLIOGRAPHY|APPENDIX|INDEX|NOTES|GLOSSARY|AFTERWORD|EPILOGUE)\s*$",
+        re.IGNORECASE | re.MULTILINE,
+    ),
+]
+
 CHAPTER_IGNORE_PATTERNS = [
     re.compile(r"^\d+\.\s+[A-Z]\.$"),
     re.compile(r"^\d+\.\s+[A-Z]\s+\d+$"),
@@ -47,9 +75,36 @@ POSTTEXT_MARKER_PATTERNS = [
     re.compile(r"^epilogue\s*$", re.IGNORECASE),
 ]
 
+PDF_WRITERS = ("fitz", "pypdf2")
+EXTRA_HEADING_RULES = ("roman", "part")
+OCR_MODES = ("full", "pages")
+CACHE_BACKENDS = ("json", "sqlite")
+MANIFEST_NAME = "pdfsplitter_manifest.jsonl"
+# Default output directory of a book: <stem>_output next to it.
+OUTPUT_DIR_SUFFIX = "_output"
+# PDFs a batch classifies for OCR at a time; each chunk's books start while
+# the next chunk is classified.
+OCR_CLASSIFY_CHUNK = 32
+# Where EPUB chapters find images, stylesheets and fonts: one resources/
+# directory for the whole book, or a <chapter>_files/ copy per chapter.
+EPUB_RESOURCE_MODES = ("shared", "copy")
+# Text renderings of a chapter, with the suffix of their files.
+TEXT_FORMATS = {"text": ".txt", "markdown": ".md"}
+EPUB_FORMATS = ("xhtml", *TEXT_FORMATS)
+
 MIN_TEXT_CHARS = 50
 MAX_SAMPLE_CHARS = 3000
 SAMPLE_PAGES = 3
 MIN_CHAPTER_TITLE_LENGTH = 5
 MIN_PAGE_CONTENT_LENGTH = 200
 MIN_PAGES_BETWEEN_CHAPTERS = 3
+
+# TOC chapters are confirmed by finding their heading within this many pages
+# of the TOC target. Past this share of unconfirmed entries the TOC is not
+# trusted and every page is scanned instead.
+TOC_VERIFY_WINDOW = 2
+TOC_VERIFY_MAX_MISSES = 0.25
+
+# EPUB nav entries nested less deep than this can start a chapter; deeper
+# ones are sections within one.
+EPUB_NAV_DEPTH = 2
@@ -1,12 +1,29 @@
-from .ocr_detector import needs_ocr
-from .pdf_processor import split_pdf
-from .epub_processor import split_epub
-from .models import Chapter, SplitResult
-
-__all__ = [
-    "needs_ocr",
-    "split_pdf",
-    "split_epub",
-    "Chapter",
-    "SplitResult",
-]
+from importlib import import_module
+
+# Submodules pull in fitz and PyPDF2, so they load on first access.
+_EXPORTS = {
+    "needs_ocr": ".ocr_detector",
+    "split_pdf": ".pdf_processor",
+    "split_epub": ".epub_processor",
+    "iter_split": ".streaming",
+    "SplitStream": ".streaming",
+    "Chapter": ".models",
+    "SplitResult": ".models",
+    "FitzWriter": ".writers",
+    "PyPDF2Writer": ".writers",
+    "get_writer": ".writers",
+    "load_split_index": ".materialize",
+    "materialize_chapter": ".materialize",
+    "chapter_bytes": ".materialize",
+    "page_range_bytes": ".materialize",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,30 @@
+from pathlib import Path
+from .incremental import atomic_output
+from .models import Chapter
+from .page_index import PageTextIndex
+
+# Between pages of a .txt chapter, as pdftotext does.
+PAGE_BREAK = "\f"
+
+
+def write_chapter_text(
+    index: PageTextIndex, chapter: Chapter, output_path: Path, markdown: bool = False
+):
+    """
+    Write a chapter's text one page at a time. Pages read during detection
+    come from the index; the rest are extracted once and not kept, so a
+    long chapter is never held in memory. Markdown output starts with the
+    chapter title and marks where each page begins.
+    """
+    with atomic_output(output_path) as partial:
+        with open(partial, "w", encoding="utf-8") as output:
+            if markdown:
+                output.write(f"# {chapter.title}\n")
+            for page_num in range(chapter.start_page, chapter.end_page + 1):
+                text = index.text(page_num, keep=False).strip("\n")
+                if markdown:
+                    output.write(f"\n<!-- page {page_num + 1} -->\n\n{text}\n")
+                else:
+                    if page_num > chapter.start_page:
+                        output.write(PAGE_BREAK)
+                    output.write(f"{text}\n")
@@ -0,0 +1,233 @@
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import IO, Optional
+from urllib.parse import unquote, urldefrag
+from ..utils import get_logger
+
+logger = get_logger(__name__)
+
+CONTAINER_PATH = "META-INF/container.xml"
+
+_SCHEME = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*:")
+
+
+@dataclass
+class ManifestItem:
+    id: str
+    member: str
+    media_type: str
+    properties: str = ""
+
+
+@dataclass
+class NavPoint:
+    title: str
+    member: str
+    fragment: str
+    depth: int
+
+
+def _tag(element) -> str:
+    return element.tag.rsplit("}", 1)[-1]
+
+
+def _children(element, name: str):
+    return [child for child in element if _tag(child) == name]
+
+
+class _NavParser(HTMLParser):
+    # Collects the links of an EPUB 3 <nav epub:type="toc"> with their <ol>
+    # nesting depth. html.parser copes with entities and sloppy markup that
+    # would stop a strict XML parser.
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: list[tuple[str, str, int]] = []
+        self._nav_depth = 0
+        self._in_toc = False
+        self._ol_depth = 0
+        self._href: Optional[str] = None
+        self._text: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "nav":
+            self._nav_depth += 1
+            if self._nav_depth == 1:
+                self._in_toc = "toc" in (attrs.get("epub:type") or "").split()
+        elif not self._in_toc:
+            return
+        elif tag == "ol":
+            self._ol_depth += 1
+        elif tag == "a" and attrs.get("href"):
+            self._href = attrs["href"]
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == "nav":
+            self._nav_depth -= 1
+            if self._nav_depth == 0:
+                self._in_toc = False
+        elif not self._in_toc:
+            return
+        elif tag == "ol":
+            self._ol_depth -= 1
+        elif tag == "a" and self._href is not None:
+            title = " ".join("".join(self._text).split())
+            self.links.append((title, self._href, max(self._ol_depth - 1, 0)))
+            self._href = None
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+
+class EpubArchive:
+    """
+    An EPUB read straight from its zip. Opening parses only the container
+    and package document; chapter documents and resources are read from
+    the archive when asked for, so memory does not grow with the book.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        try:
+            self.zip = zipfile.ZipFile(self.path)
+            self._members = set(self.zip.namelist())
+            self.package_path = self._find_package()
+            package = ET.fromstring(self.zip.read(self.package_path))
+        except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+            raise ValueError(f"{self.path} is not a readable EPUB: {e}") from e
+
+        self.base = posixpath.dirname(self.package_path)
+        self.manifest: dict[str, ManifestItem] = {}
+        for manifest in _children(package, "manifest"):
+            for item in _children(manifest, "item"):
+                href = item.get("href")
+                if not href:
+                    continue
+                self.manifest[item.get("id")] = ManifestItem(
+                    id=item.get("id"),
+                    member=self.resolve(href, self.package_path)[0],
+                    media_type=item.get("media-type", ""),
+                    properties=item.get("properties", ""),
+                )
+
+        self.spine: list[ManifestItem] = []
+        self._ncx_id = None
+        for spine in _children(package, "spine"):
+            self._ncx_id = spine.get("toc")
+            for itemref in _children(spine, "itemref"):
+                item = self.manifest.get(itemref.get("idref"))
+                if item is None:
+                    continue
+                if item.member not in self._members:
+                    logger.warning(f"Spine document {item.member} is missing")
+                    continue
+                self.spine.append(item)
+
+    def _find_package(self) -> str:
+        container = ET.fromstring(self.zip.read(CONTAINER_PATH))
+        for rootfile in container.iter():
+            if _tag(rootfile) == "rootfile" and rootfile.get("full-path"):
+                return rootfile.get("full-path")
+        raise KeyError(f"no rootfile in {CONTAINER_PATH}")
+
+    def resolve(self, href: str, relative_to: str) -> tuple[Optional[str], str]:
+        """
+        Turn an href found in relative_to into an archive member name and
+        fragment. The member is None for external and in-document links.
+        """
+        href, fragment = urldefrag(href.strip())
+        if not href or _SCHEME.match(href) or href.startswith("/"):
+            return None, fragment
+        member = posixpath.normpath(
+            posixpath.join(posixpath.dirname(relative_to), unquote(href))
+        )
+        return member, fragment
+
+    def has(self, member: Optional[str]) -> bool:
+        return member in self._members
+
+    def size(self, member: str) -> int:
+        return self.zip.getinfo(member).file_size
+
+    def read(self, member: str) -> bytes:
+        return self.zip.read(member)
+
+    def read_text(self, member: str) -> str:
+        return self.zip.read(member).decode("utf-8-sig", errors="replace")
+
+    def open(self, member: str) -> IO[bytes]:
+        return self.zip.open(member)
+
+    def nav_points(self) -> list[NavPoint]:
+        """
+        Table of contents entries from the EPUB 3 nav document, or from the
+        NCX when there is no usable nav document.
+        """
+        for item in self.manifest.values():
+            if "nav" in item.properties.split() and self.has(item.member):
+                points = self._nav_document_points(item.member)
+                if points:
+                    return points
+
+        ncx = self.manifest.get(self._ncx_id) if self._ncx_id else None
+        if ncx is None:
+            ncx = next(
+                (
+                    i
+                    for i in self.manifest.values()
+                    if i.media_type == "application/x-dtbncx+xml"
+                ),
+                None,
+            )
+        if ncx is not None and self.has(ncx.member):
+            try:
+                return self._ncx_points(ncx.member)
+            except ET.ParseError as e:
+                logger.warning(f"Could not parse {ncx.member}: {e}")
+        return []
+
+    def _nav_document_points(self, member: str) -> list[NavPoint]:
+        parser = _NavParser()
+        parser.feed(self.read_text(member))
+        points = []
+        for title, href, depth in parser.links:
+            target, fragment = self.resolve(href, member)
+            if target is not None:
+                points.append(NavPoint(title, target, fragment, depth))
+        return points
+
+    def _ncx_points(self, member: str) -> list[NavPoint]:
+        points = []
+
+        def walk(element, depth):
+            for nav_point in _children(element, "navPoint"):
+                title = ""
+                for label in _children(nav_point, "navLabel"):
+                    title = " ".join("".join(label.itertext()).split())
+                content = _children(nav_point, "content")
+                if content and content[0].get("src"):
+                    target, fragment = self.resolve(content[0].get("src"), member)
+                    if target is not None:
+                        points.append(NavPoint(title, target, fragment, depth))
+                walk(nav_point, depth + 1)
+
+        root = ET.fromstring(self.read(member))
+        for nav_map in _children(root, "navMap"):
+            walk(nav_map, 0)
+        return points
+
+    def close(self):
+        self.zip.close()
+
+    def __enter__(self) -> "EpubArchive":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,102 +1,358 @@
+import html
 import json
+import posixpath
+import re
+import shutil
 from pathlib import Path
-from ebooklib import epub
-from bs4 import BeautifulSoup
+from typing import Iterator, Optional
+from urllib.parse import quote
+from .epub_archive import EpubArchive
+from .html_text import xhtml_to_text
+from .incremental import atomic_output
 from .models import Chapter, SplitResult
+from .streaming import SplitStream
+from ..constants import EPUB_FORMATS, EPUB_NAV_DEPTH, EPUB_RESOURCE_MODES, TEXT_FORMATS
 from ..utils import get_logger
+from ..utils.parallel import iter_largest_first
 
 logger = get_logger(__name__)
 
+_LINK_ATTR = re.compile(
+    r"""(\s(?:src|href|xlink:href|poster)\s*=\s*)(["'])(.*?)\2""",
+    re.IGNORECASE | re.DOTALL,
+)
+_CSS_URL = re.compile(
+    r"""url\(\s*(["']?)([^"')]+)\1\s*\)|@import\s+(["'])([^"']+)\3""",
+    re.IGNORECASE,
+)
+_STYLE_BLOCK = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.I | re.S)
+_BODY = re.compile(r"<body\b[^>]*>(.*)</body\s*>", re.I | re.S)
+_BODY_END = re.compile(r"</body\s*>", re.I)
 
-def extract_epub_chapters(epub_path: Path) -> list[Chapter]:
-    chapters = []
 
-    try:
-        book = epub.read_epub(str(epub_path))
-
-        def process_navpoint(navpoint, section_num=None, depth=0):
-            if isinstance(navpoint, tuple):
-                nav, children = navpoint
-                title = getattr(nav, "title", str(nav)) or f"Section {section_num}"
-                href = getattr(nav, "href", None)
-
-                if depth < 2:
-                    chapters.append(
-                        Chapter(
-                            title=title.strip(),
-                            start_page=len(chapters),
-                            end_page=len(chapters),
-                            file_path=None,
-                        )
-                    )
-
-                if children:
-                    for i, child in enumerate(children):
-                        process_navpoint(
-                            child,
-                            f"{section_num}.{i + 1}" if section_num else str(i + 1),
-                            depth + 1,
-                        )
-
-        for i, navpoint in enumerate(book.toc):
-            process_navpoint(navpoint, str(i + 1))
+def plan_epub_chapters(
+    archive: EpubArchive, max_depth: int = EPUB_NAV_DEPTH
+) -> list[Chapter]:
+    """
+    Map the table of contents onto the spine. Each chapter is the run of
+    spine documents from the one its nav entry points at up to the next
+    chapter's; start_page and end_page are spine positions. Documents
+    before the first entry are Pre-text, those after the last one the
+    table of contents reaches are Post-text.
+    """
+    spine = archive.spine
+    position = {item.member: i for i, item in enumerate(spine)}
 
-        if not chapters:
-            for i, item in enumerate(book.get_items()):
-                if item.get_type() == epub.ITEM_DOCUMENT:
-                    title = item.get_name()
-                    chapters.append(
-                        Chapter(
-                            title=f"Section {i + 1}",
-                            start_page=i,
-                            end_page=i,
-                            file_path=None,
-                        )
-                    )
-
-    except Exception as e:
-        logger.error(f"Error extracting EPUB chapters: {e}")
+    starts: list[tuple[int, str]] = []
+    last_referenced = -1
+    for point in archive.nav_points():
+        i = position.get(point.member)
+        if i is None:
+            continue
+        last_referenced = max(last_referenced, i)
+        # Entries inside a document that already starts a chapter are
+        # sections of it; a document is never split.
+        if point.depth >= max_depth or (starts and i <= starts[-1][0]):
+            continue
+        starts.append((i, point.title or f"Section {i + 1}"))
 
+    if not starts:
+        return [
+            Chapter(title=f"Section {i + 1}", start_page=i, end_page=i)
+            for i in range(len(spine))
+        ]
+
+    chapters = []
+    if starts[0][0] > 0:
+        chapters.append(
+            Chapter(title="Pre-text", start_page=0, end_page=starts[0][0] - 1)
+        )
+
+    ends = [start - 1 for start, _ in starts[1:]] + [last_referenced]
+    for (start, title), end in zip(starts, ends):
+        chapters.append(Chapter(title=title, start_page=start, end_page=end))
+
+    if last_referenced < len(spine) - 1:
+        chapters.append(
+            Chapter(
+                title="Post-text",
+                start_page=last_referenced + 1,
+                end_page=len(spine) - 1,
+            )
+        )
     return chapters
 
 
-def split_epub(epub_path: Path, output_dir: Path) -> SplitResult:
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+def extract_epub_chapters(epub_path: Path) -> list[Chapter]:
+    with EpubArchive(epub_path) as archive:
+        return plan_epub_chapters(archive)
 
-    chapters = extract_epub_chapters(epub_path)
 
-    if not chapters:
-        chapters = [
-            Chapter(
-                title="Complete Document",
-                start_page=0,
-                end_page=0,
-                file_path=output_dir / "chapter_01.xhtml",
+def _documents(archive: EpubArchive, chapter: Chapter) -> list[str]:
+    return [
+        archive.spine[i].member for i in range(chapter.start_page, chapter.end_page + 1)
+    ]
+
+
+class _Resources:
+    """
+    Copies archive members into directory on first use, keeping their
+    layout relative to the package document so stylesheets still find
+    their fonts and images.
+    """
+
+    def __init__(self, archive: EpubArchive, directory: Path):
+        self.archive = archive
+        self.directory = directory
+        self._copied: dict[str, Optional[str]] = {}
+
+    def link(self, member: str) -> Optional[str]:
+        if member in self._copied:
+            return self._copied[member]
+
+        relative = posixpath.relpath(member, self.archive.base or ".")
+        if relative.startswith("../"):
+            relative = member
+        if relative.startswith(("../", "/")):
+            logger.warning(f"Not copying {member}: it points outside the book")
+            relative = None
+        self._copied[member] = relative
+        if relative is None:
+            return None
+
+        target = self.directory / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with self.archive.open(member) as source:
+            with open(target, "wb") as output:
+                shutil.copyfileobj(source, output)
+
+        if member.lower().endswith(".css"):
+            for match in _CSS_URL.finditer(self.archive.read_text(member)):
+                href = match.group(2) or match.group(4)
+                referenced, _ = self.archive.resolve(href, member)
+                if self.archive.has(referenced):
+                    self.link(referenced)
+        return relative
+
+
+class _ChapterWriter:
+    def __init__(
+        self,
+        archive: EpubArchive,
+        output_dir: Path,
+        chapters: list[Chapter],
+        resources: str,
+    ):
+        self.archive = archive
+        self.output_dir = output_dir
+        # Spine document -> the chapter file it ends up in, for links
+        # between documents.
+        self.chapter_files = {
+            archive.spine[i].member: c.file_path.name
+            for c in chapters
+            for i in range(c.start_page, c.end_page + 1)
+        }
+        self.shared = (
+            _Resources(archive, output_dir / "resources")
+            if resources == "shared"
+            else None
+        )
+
+    def _target(self, href: str, member: str, resources, prefix: str):
+        target, fragment = self.archive.resolve(html.unescape(href), member)
+        if not self.archive.has(target):
+            return None
+        if target in self.chapter_files:
+            link = self.chapter_files[target]
+        else:
+            relative = resources.link(target)
+            if relative is None:
+                return None
+            link = f"{prefix}/{quote(relative)}"
+        return f"{link}#{fragment}" if fragment else link
+
+    def _document(self, member: str, resources, prefix: str) -> str:
+        def attribute(match):
+            link = self._target(match.group(3), member, resources, prefix)
+            if link is None:
+                return match.group(0)
+            return f"{match.group(1)}{match.group(2)}{link}{match.group(2)}"
+
+        def css_url(match):
+            href = match.group(2) or match.group(4)
+            link = self._target(href, member, resources, prefix)
+            return match.group(0) if link is None else f'url("{link}")'
+
+        def style(match):
+            return (
+                match.group(1) + _CSS_URL.sub(css_url, match.group(2)) + match.group(3)
             )
-        ]
 
-    for i, chapter in enumerate(chapters):
-        chapter_path = output_dir / f"chapter_{i + 1:02d}.xhtml"
-        chapter.file_path = chapter_path
-        chapter_path.write_text(
-            f"<html><body><h1>{chapter.title}</h1><p>Extracted from {epub_path.name}</p></body></html>"
+        text = _LINK_ATTR.sub(attribute, self.archive.read_text(member))
+        return _STYLE_BLOCK.sub(style, text)
+
+    def write(self, chapter: Chapter):
+        if self.shared is not None:
+            resources, prefix = self.shared, "resources"
+        else:
+            prefix = f"{chapter.file_path.stem}_files"
+            resources = _Resources(self.archive, self.output_dir / prefix)
+
+        members = _documents(self.archive, chapter)
+
+        # The first document keeps its head; later ones contribute their
+        # bodies, read one at a time.
+        first = self._document(members[0], resources, prefix)
+        body_ends = list(_BODY_END.finditer(first))
+        split_at = body_ends[-1].start() if body_ends else len(first)
+
+        with atomic_output(chapter.file_path) as partial:
+            with open(partial, "w", encoding="utf-8") as output:
+                output.write(first[:split_at])
+                for member in members[1:]:
+                    body = _BODY.search(self._document(member, resources, prefix))
+                    if body is None:
+                        logger.warning(f"{member} has no <body>; left out")
+                        continue
+                    output.write(body.group(1))
+                output.write(first[split_at:])
+
+
+def _write_chapter_text(
+    archive: EpubArchive, members: list[str], output_path: Path, markdown: bool
+):
+    texts = [xhtml_to_text(archive.read(member), markdown) for member in members]
+    with atomic_output(output_path) as partial:
+        partial.write_text("\n\n".join(t for t in texts if t) + "\n", encoding="utf-8")
+
+
+def iter_write_chapter_text(
+    archive: EpubArchive,
+    chapters: list[Chapter],
+    markdown: bool = False,
+    jobs: int = 1,
+) -> Iterator[Chapter]:
+    """
+    Convert chapters to text or Markdown files, yielding each once it is
+    written. With jobs > 1 the XHTML is parsed in worker processes, each
+    reading the archive itself, and chapters come back in completion order.
+    """
+    if jobs <= 1 or len(chapters) < 2:
+        for chapter in chapters:
+            _write_chapter_text(
+                archive, _documents(archive, chapter), chapter.file_path, markdown
+            )
+            yield chapter
+        return
+
+    yield from iter_largest_first(
+        chapters,
+        size=lambda c: sum(archive.size(m) for m in _documents(archive, c)),
+        work=_write_chapter_text,
+        args=lambda c: (_documents(archive, c), c.file_path, markdown),
+        jobs=jobs,
+        open_resource=EpubArchive,
+        resource_args=(archive.path,),
+    )
+
+
+def _write_epub_chapters(
+    archive: EpubArchive,
+    output_dir: Path,
+    chapters: list[Chapter],
+    output_format: str,
+    resources: str,
+    jobs: int,
+) -> Iterator[Chapter]:
+    if output_format == "xhtml":
+        writer = _ChapterWriter(archive, output_dir, chapters, resources)
+        for chapter in chapters:
+            writer.write(chapter)
+            yield chapter
+    else:
+        yield from iter_write_chapter_text(
+            archive, chapters, output_format == "markdown", jobs
         )
 
     metadata = {
-        "original_file": str(epub_path),
+        "original_file": str(archive.path.resolve()),
+        "total_documents": len(archive.spine),
+        "format": output_format,
+        "resources": resources if output_format == "xhtml" else None,
         "chapters": [
             {
                 "title": c.title,
                 "start_page": c.start_page,
                 "end_page": c.end_page,
-                "file_path": str(c.file_path) if c.file_path else None,
+                "file_path": str(c.file_path),
+                "file_name": c.file_path.name,
+                "documents": _documents(archive, c),
             }
             for c in chapters
         ],
     }
-    (output_dir / "metadata.json").write_text(json.dumps(metadata, indent=2))
+    with atomic_output(output_dir / "metadata.json") as partial:
+        partial.write_text(json.dumps(metadata, indent=2))
+
+
+def iter_split_epub(
+    epub_path: Path,
+    output_dir: Path,
+    resources: str = "shared",
+    output_format: str = "xhtml",
+    jobs: int = 1,
+) -> SplitStream:
+    """
+    Plan the chapters of an EPUB and return a SplitStream that writes each
+    one as a single XHTML file with the content of its spine documents, or
+    as plain text or Markdown converted by jobs worker processes.
+    """
+    if output_format not in EPUB_FORMATS:
+        raise ValueError(
+            f"Unknown EPUB output format {output_format!r}; "
+            f"choose from {', '.join(EPUB_FORMATS)}"
+        )
+    if resources not in EPUB_RESOURCE_MODES:
+        raise ValueError(
+            f"Unknown EPUB resource mode {resources!r}; "
+            f"choose from {', '.join(EPUB_RESOURCE_MODES)}"
+        )
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
-    return SplitResult(
-        original=epub_path, chapters=chapters, pretext=None, posttext=None
+    archive = EpubArchive(epub_path)
+    try:
+        logger.info(f"Processing: {archive.path}")
+        chapters = plan_epub_chapters(archive)
+        if not chapters:
+            raise ValueError(f"{archive.path} has no readable spine documents")
+        suffix = TEXT_FORMATS.get(output_format, ".xhtml")
+        for i, chapter in enumerate(chapters):
+            chapter.file_path = output_dir / f"chapter_{i + 1:02d}{suffix}"
+    except Exception:
+        archive.close()
+        raise
+
+    return SplitStream(
+        archive.path,
+        chapters,
+        _write_epub_chapters(
+            archive, output_dir, chapters, output_format, resources, jobs
+        ),
+        archive.close,
     )
+
+
+def split_epub(
+    epub_path: Path,
+    output_dir: Path,
+    resources: str = "shared",
+    output_format: str = "xhtml",
+    jobs: int = 1,
+) -> SplitResult:
+    with iter_split_epub(
+        epub_path, output_dir, resources, output_format, jobs
+    ) as stream:
+        result = stream.result()
+    logger.info(f"Successfully split into {len(result.chapters)} sections")
+    return result
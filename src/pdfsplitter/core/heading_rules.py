@@ -0,0 +1,157 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+from ..constants import (
+    CHAPTER_HEADING_PATTERNS,
+    CHAPTER_IGNORE_PATTERNS,
+    PART_HEADING_PATTERNS,
+    POSTTEXT_HEADING_PATTERNS,
+    POSTTEXT_MARKER_PATTERNS,
+    ROMAN_CHAPTER_PATTERNS,
+    TOC_ENTRY_PATTERNS,
+    TOC_HEADER_PATTERNS,
+)
+
+# Checked in this order, so a line that matches an ignore rule is never
+# reported as a chapter heading.
+LINE_KINDS = ("ignore", "chapter", "posttext")
+
+CHAPTER_NUMBER_PATTERN = re.compile(r"^\s*CHAPTER\s+(\d+)\b", re.IGNORECASE)
+
+_SCOPED_FLAGS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"))
+
+Pattern = Union[str, re.Pattern]
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    name: str
+    kind: str
+    patterns: tuple[Pattern, ...]
+
+
+def _alternative(pattern: Pattern) -> str:
+    # Keep each pattern's own flags once it is merged into a combined regex.
+    if isinstance(pattern, str):
+        return f"(?:{pattern})"
+    flags = "".join(c for flag, c in _SCOPED_FLAGS if pattern.flags & flag)
+    return f"(?{flags}:{pattern.pattern})" if flags else f"(?:{pattern.pattern})"
+
+
+def _combine(patterns: Iterable[Pattern]) -> Optional[re.Pattern]:
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join(_alternative(p) for p in patterns))
+
+
+class HeadingRules:
+    """
+    Heading rule sets compiled into one regex per use. classify() labels a
+    header line as ignore, chapter or posttext with a single match call,
+    however many rule sets are registered.
+    """
+
+    def __init__(self, rule_sets: Iterable[RuleSet] = ()):
+        self.rule_sets: dict[str, RuleSet] = {}
+        for rule_set in rule_sets:
+            self.rule_sets[rule_set.name] = rule_set
+        self._compile()
+
+    def register(self, rule_set: RuleSet):
+        if rule_set.kind not in LINE_KINDS + ("toc_header", "toc_entry"):
+            raise ValueError(f"Unknown heading rule kind: {rule_set.kind}")
+        self.rule_sets[rule_set.name] = rule_set
+        self._compile()
+
+    def _patterns(self, kind: str) -> list[Pattern]:
+        return [
+            p for rs in self.rule_sets.values() if rs.kind == kind for p in rs.patterns
+        ]
+
+    def _compile(self):
+        line_groups = []
+        for kind in LINE_KINDS:
+            combined = _combine(self._patterns(kind))
+            if combined is not None:
+                line_groups.append(f"(?P<{kind}>{combined.pattern})")
+        self._line = re.compile("|".join(line_groups)) if line_groups else None
+        self._toc_header = _combine(self._patterns("toc_header"))
+
+        # TOC entry patterns each capture (number, title, page). Every
+        # alternative is wrapped in a group, so the match's lastindex is that
+        # wrapper and the three captures follow it.
+        self._toc_entry = _combine(
+            f"({_alternative(p)})" for p in self._patterns("toc_entry")
+        )
+
+        self.signature = hashlib.sha256(
+            repr(
+                [
+                    (rs.kind, [getattr(p, "pattern", p) for p in rs.patterns])
+                    for rs in self.rule_sets.values()
+                ]
+            ).encode()
+        ).hexdigest()[:8]
+
+    def classify(self, line: str) -> Optional[str]:
+        if self._line is None:
+            return None
+        match = self._line.match(line)
+        return match.lastgroup if match else None
+
+    def is_ignored(self, line: str) -> bool:
+        return self.classify(line) == "ignore"
+
+    def is_chapter_heading(self, line: str) -> bool:
+        return self.classify(line) == "chapter"
+
+    def is_posttext_marker(self, line: str) -> bool:
+        return self.classify(line) == "posttext"
+
+    def is_toc_header(self, text: str) -> bool:
+        return bool(self._toc_header and self._toc_header.search(text))
+
+    def match_toc_entry(self, line: str) -> Optional[tuple[str, str, str]]:
+        if self._toc_entry is None:
+            return None
+        match = self._toc_entry.match(line)
+        if not match:
+            return None
+        first = match.lastindex
+        return match.group(first + 1, first + 2, first + 3)
+
+
+DEFAULT_RULE_SETS = (
+    RuleSet("chapter_ignore", "ignore", tuple(CHAPTER_IGNORE_PATTERNS)),
+    RuleSet("chapter", "chapter", tuple(CHAPTER_HEADING_PATTERNS)),
+    RuleSet(
+        "posttext",
+        "posttext",
+        tuple(POSTTEXT_MARKER_PATTERNS + POSTTEXT_HEADING_PATTERNS),
+    ),
+    RuleSet("toc_header", "toc_header", tuple(TOC_HEADER_PATTERNS)),
+    RuleSet("toc_entry", "toc_entry", tuple(TOC_ENTRY_PATTERNS)),
+)
+
+# Keys must match constants.EXTRA_HEADING_RULES, which the CLI offers.
+EXTRA_RULE_SETS = {
+    "roman": RuleSet("roman", "chapter", tuple(ROMAN_CHAPTER_PATTERNS)),
+    "part": RuleSet("part", "chapter", tuple(PART_HEADING_PATTERNS)),
+}
+
+HEADING_RULES = HeadingRules(DEFAULT_RULE_SETS)
+
+
+def register_rule_set(rule_set: Union[str, RuleSet]):
+    """Add a rule set, or one of EXTRA_RULE_SETS by name, to the shared rules."""
+    if isinstance(rule_set, str):
+        try:
+            rule_set = EXTRA_RULE_SETS[rule_set]
+        except KeyError:
+            raise ValueError(
+                f"Unknown heading rule set: {rule_set} "
+                f"(choose from {', '.join(EXTRA_RULE_SETS)})"
+            )
+    HEADING_RULES.register(rule_set)
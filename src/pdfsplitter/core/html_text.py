@@ -0,0 +1,236 @@
+import re
+from typing import Optional
+from lxml import etree
+
+# Contents never rendered as text.
+SKIP_TAGS = {"head", "script", "style", "template", "noscript", "title"}
+
+BLOCK_TAGS = {
+    "address",
+    "article",
+    "aside",
+    "body",
+    "caption",
+    "dd",
+    "div",
+    "dl",
+    "dt",
+    "figcaption",
+    "figure",
+    "footer",
+    "header",
+    "hr",
+    "main",
+    "nav",
+    "ol",
+    "p",
+    "section",
+    "table",
+    "ul",
+}
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+EMPHASIS_TAGS = {"em": "*", "i": "*", "strong": "**", "b": "**"}
+
+_WHITESPACE = re.compile(r"\s+")
+_EXTERNAL_LINK = re.compile(r"^(?:https?|mailto):", re.IGNORECASE)
+
+# libxml2's HTML parser: far faster than a Python tree builder, and it
+# accepts both XHTML and the tag soup some EPUBs ship.
+_PARSER = etree.HTMLParser(
+    encoding="utf-8", remove_comments=True, remove_pis=True, no_network=True
+)
+
+
+def _local_name(tag) -> Optional[str]:
+    if not isinstance(tag, str):
+        return None
+    return tag.rsplit("}", 1)[-1].rsplit(":", 1)[-1].lower()
+
+
+def _first_row(row) -> bool:
+    for ancestor in row.iterancestors():
+        if _local_name(ancestor.tag) == "table":
+            return next(ancestor.iter("tr"), None) is row
+    return row.getprevious() is None
+
+
+def _in_list_item(element) -> bool:
+    parent = element.getparent()
+    return parent is not None and _local_name(parent.tag) == "li"
+
+
+class _TextBuilder:
+    """
+    Collects inline text with collapsed whitespace. Blocks are separated
+    by exactly one blank line, however deeply they are nested.
+    """
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.line: list[str] = []
+        self.pending_break = 0
+
+    def write(self, text: str, raw: bool = False):
+        if not raw:
+            text = _WHITESPACE.sub(" ", text)
+            if not self.line or self.pending_break or self.line[-1].endswith(" "):
+                text = text.lstrip()
+        if not text:
+            return
+        if self.pending_break:
+            self._flush_line()
+            if self.lines and self.pending_break > 1:
+                self.lines.append("")
+            self.pending_break = 0
+        self.line.append(text)
+
+    def _flush_line(self):
+        if self.line:
+            self.lines.append("".join(self.line).rstrip())
+            self.line = []
+
+    def newline(self):
+        if self.line:
+            self._flush_line()
+        elif self.lines:
+            self.lines.append("")
+
+    def line_break(self):
+        if self.line or self.lines:
+            self.pending_break = max(self.pending_break, 1)
+
+    def block(self):
+        if self.line or self.lines:
+            self.pending_break = 2
+
+    def text(self) -> str:
+        self._flush_line()
+        return "\n".join(self.lines).strip("\n")
+
+
+class _Renderer:
+    def __init__(self, markdown: bool):
+        self.markdown = markdown
+
+    def render(self, element) -> str:
+        out = _TextBuilder()
+        self._children(element, out)
+        return out.text()
+
+    def _children(self, element, out: _TextBuilder):
+        if element.text:
+            out.write(element.text)
+        for child in element:
+            self._element(child, out)
+            if child.tail:
+                out.write(child.tail)
+
+    def _nested(self, element, out: _TextBuilder, prefix: str, rest: str, tight: bool):
+        # Render a list item or quote on its own and indent its lines.
+        text = self.render(element)
+        if not text:
+            return
+        separate = out.line_break if tight else out.block
+        separate()
+        for i, line in enumerate(text.split("\n")):
+            out.write(
+                (prefix if i == 0 else rest) + line if line else rest.rstrip(), raw=True
+            )
+            out.newline()
+        separate()
+
+    def _inline(self, element, out: _TextBuilder, before: str, after: str):
+        # Whitespace just inside the markup belongs outside the markers.
+        text = _WHITESPACE.sub(" ", "".join(element.itertext()))
+        if not text.strip():
+            out.write(text)
+            return
+        lead = " " if text.startswith(" ") else ""
+        trail = " " if text.endswith(" ") else ""
+        out.write(f"{lead}{before}{text.strip()}{after}{trail}")
+
+    def _element(self, element, out: _TextBuilder):
+        tag = _local_name(element.tag)
+        if tag is None or tag in SKIP_TAGS:
+            return
+
+        if tag == "br":
+            out.newline()
+        elif tag in HEADING_TAGS:
+            out.block()
+            if self.markdown:
+                out.write("#" * HEADING_TAGS[tag] + " ", raw=True)
+            self._children(element, out)
+            out.block()
+        elif tag == "pre":
+            out.block()
+            text = "".join(element.itertext()).strip("\n")
+            if self.markdown:
+                text = f"```\n{text}\n```"
+            for i, line in enumerate(text.split("\n")):
+                if i:
+                    out.newline()
+                out.write(line, raw=True)
+            out.block()
+        elif tag == "li":
+            parent = element.getparent()
+            if self.markdown and parent is not None and _local_name(parent.tag) == "ol":
+                marker = f"{parent.index(element) + 1}. "
+            else:
+                marker = "- "
+            self._nested(element, out, marker, " " * len(marker), tight=True)
+        elif tag == "blockquote":
+            prefix = "> " if self.markdown else "    "
+            self._nested(element, out, prefix, prefix, tight=False)
+        elif tag == "tr":
+            cells = [
+                self.render(cell).replace("\n", " ")
+                for cell in element
+                if _local_name(cell.tag) in ("td", "th")
+            ]
+            out.line_break()
+            out.write("| " + " | ".join(cells) + " |", raw=True)
+            if self.markdown and _first_row(element):
+                out.line_break()
+                out.write("|" + " --- |" * len(cells), raw=True)
+            out.line_break()
+        elif tag == "img":
+            alt = _WHITESPACE.sub(" ", element.get("alt") or "").strip()
+            if alt:
+                out.write(f"[Image: {alt}]")
+        elif self.markdown and tag in EMPHASIS_TAGS:
+            marker = EMPHASIS_TAGS[tag]
+            self._inline(element, out, marker, marker)
+        elif self.markdown and tag == "code":
+            self._inline(element, out, "`", "`")
+        elif (
+            self.markdown
+            and tag == "a"
+            and _EXTERNAL_LINK.match(element.get("href") or "")
+        ):
+            self._inline(element, out, "[", f"]({element.get('href')})")
+        elif tag in ("ul", "ol") and _in_list_item(element):
+            out.line_break()
+            self._children(element, out)
+            out.line_break()
+        elif tag in BLOCK_TAGS:
+            out.block()
+            self._children(element, out)
+            out.block()
+        else:
+            self._children(element, out)
+
+
+def xhtml_to_text(data: bytes, markdown: bool = False) -> str:
+    """
+    Render an (X)HTML document's body as plain text, or as Markdown with
+    headings, lists, emphasis, code and external links kept. The same
+    input always gives the same output.
+    """
+    if not data.strip():
+        return ""
+    root = etree.fromstring(data, _PARSER)
+    if root is None:
+        return ""
+    body = next((e for e in root.iter() if _local_name(e.tag) == "body"), root)
+    return _Renderer(markdown).render(body)
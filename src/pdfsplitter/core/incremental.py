@@ -0,0 +1,139 @@
+import json
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, Optional
+from .models import Chapter
+from ..utils import get_logger
+from ..utils.fingerprint import file_sha256
+
+logger = get_logger(__name__)
+
+PARTIAL_SUFFIX = ".partial"
+
+
+@contextmanager
+def atomic_output(output_path: Path) -> Iterator[Path]:
+    """
+    Yield a temporary path next to output_path that replaces it once the
+    block completes, so a crash never leaves a half-written file behind.
+    """
+    partial = output_path.with_name(f".{output_path.name}{PARTIAL_SUFFIX}")
+    try:
+        yield partial
+        os.replace(partial, output_path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+
+
+@dataclass
+class OutputPlan:
+    write: list[Chapter] = field(default_factory=list)
+    # File name -> sha256 of chapter files that are already up to date.
+    unchanged: dict[str, str] = field(default_factory=dict)
+    stale: list[Path] = field(default_factory=list)
+
+
+def load_metadata(output_dir: Path) -> Optional[dict]:
+    try:
+        return json.loads((output_dir / "metadata.json").read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _entry_name(entry: dict) -> Optional[str]:
+    # Metadata from before incremental splits only has file_path. Either way
+    # only the bare name is used, so no entry can point outside output_dir.
+    name = entry.get("file_name") or entry.get("file_path")
+    return Path(name).name if name else None
+
+
+def _owns_outputs(previous: dict, source: Optional[Path]) -> bool:
+    # Only an earlier PDF split lists files this split may reuse or remove;
+    # an EPUB split sharing the directory records no source_fingerprint.
+    if previous.get("source_fingerprint"):
+        return True
+    if source is None or not previous.get("original_file"):
+        return False
+    return previous["original_file"] in (str(source), str(Path(source).resolve()))
+
+
+def _is_current(chapter: Chapter, entry: Optional[dict], source_changed: bool) -> bool:
+    if entry is None or source_changed or not entry.get("sha256"):
+        return False
+    if (entry.get("start_page"), entry.get("end_page")) != (
+        chapter.start_page,
+        chapter.end_page,
+    ):
+        return False
+    try:
+        return file_sha256(chapter.file_path) == entry["sha256"]
+    except OSError:
+        return False
+
+
+def plan_outputs(
+    output_dir: Path,
+    chapters: list[Chapter],
+    source_fingerprint: str,
+    index_only: bool = False,
+    section: str = "chapters",
+    source: Optional[Path] = None,
+) -> OutputPlan:
+    """
+    Compare planned chapters with the metadata.json of an earlier split into
+    output_dir. A chapter file is kept when the source, its page range and
+    its recorded hash all still match; everything else is rewritten. Files
+    from the earlier split that are no longer planned are stale, as are
+    outdated files in index-only mode, where nothing is written.
+
+    section names the metadata list the earlier files are recorded in:
+    "chapters" for chapter PDFs, "text_files" for their text exports.
+    Metadata written by anything but a PDF split, or a split of another
+    source than `source`, is left alone.
+    """
+    previous = load_metadata(output_dir) or {}
+    source_changed = previous.get("source_fingerprint") != source_fingerprint
+    entries = {}
+    if _owns_outputs(previous, source):
+        for entry in previous.get(section, []):
+            name = _entry_name(entry)
+            if name:
+                entries[name] = entry
+
+    plan = OutputPlan()
+    planned = set()
+    for chapter in chapters:
+        if chapter.file_path is None:
+            continue
+        name = chapter.file_path.name
+        planned.add(name)
+
+        entry = entries.get(name)
+        if _is_current(chapter, entry, source_changed):
+            plan.unchanged[name] = entry["sha256"]
+        elif index_only:
+            plan.stale.append(chapter.file_path)
+        else:
+            plan.write.append(chapter)
+
+    plan.stale.extend(output_dir / name for name in entries if name not in planned)
+    # Left behind by a split that was killed mid-write.
+    plan.stale.extend(
+        output_dir / f".{name}{PARTIAL_SUFFIX}" for name in planned | set(entries)
+    )
+    return plan
+
+
+def remove_stale(plan: OutputPlan) -> int:
+    removed = 0
+    for path in plan.stale:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        logger.debug(f"Removed stale output {path}")
+        removed += 1
+    return removed
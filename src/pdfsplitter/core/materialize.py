@@ -0,0 +1,160 @@
+import io
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+from .incremental import atomic_output
+from .models import Chapter
+from .session import DocumentSession, open_session
+from .writers import PageRangeWriter, get_writer
+from ..utils import get_logger
+
+logger = get_logger(__name__)
+
+ChapterRef = Union[int, str, Chapter]
+
+
+@dataclass
+class SplitIndex:
+    """
+    A split plan read back from metadata.json. Chapters point at their
+    planned files, which may not have been written yet.
+    """
+
+    source: Path
+    total_pages: int
+    chapters: list[Chapter]
+    directory: Path
+
+
+def load_split_index(path: Path) -> SplitIndex:
+    path = Path(path)
+    if path.is_dir():
+        path = path / "metadata.json"
+    metadata = json.loads(path.read_text())
+
+    chapters = []
+    for c in metadata["chapters"]:
+        # Metadata from before index-only mode only has file_path.
+        file_name = c.get("file_name") or (
+            Path(c["file_path"]).name if c.get("file_path") else None
+        )
+        chapters.append(
+            Chapter(
+                title=c["title"],
+                start_page=c["start_page"],
+                end_page=c["end_page"],
+                file_path=path.parent / file_name if file_name else None,
+            )
+        )
+
+    return SplitIndex(
+        source=Path(metadata["original_file"]),
+        total_pages=metadata["total_pages"],
+        chapters=chapters,
+        directory=path.parent,
+    )
+
+
+def find_chapter(index: SplitIndex, chapter: ChapterRef) -> Chapter:
+    """Look a chapter up by position in the index, by title, or pass it through."""
+    if isinstance(chapter, Chapter):
+        return chapter
+    if isinstance(chapter, int):
+        return index.chapters[chapter]
+    for c in index.chapters:
+        if c.title == chapter:
+            return c
+    raise KeyError(f"No chapter titled {chapter!r} in {index.directory}")
+
+
+def write_page_range(
+    source: Union[Path, DocumentSession],
+    start_page: int,
+    end_page: int,
+    output: Union[Path, BinaryIO],
+    writer: Union[str, PageRangeWriter] = "fitz",
+    expected_pages: Optional[int] = None,
+):
+    writer = get_writer(writer)
+    with open_session(source) as session:
+        if expected_pages is not None and session.page_count != expected_pages:
+            raise ValueError(
+                f"{session.path} has {session.page_count} pages, but the index "
+                f"was built for {expected_pages}"
+            )
+        if not 0 <= start_page <= end_page < session.page_count:
+            raise ValueError(
+                f"Page range {start_page}-{end_page} is outside "
+                f"{session.path} ({session.page_count} pages)"
+            )
+        writer.write(session, start_page, end_page, output)
+
+
+def page_range_bytes(
+    source: Union[Path, DocumentSession],
+    start_page: int,
+    end_page: int,
+    writer: Union[str, PageRangeWriter] = "fitz",
+) -> bytes:
+    buffer = io.BytesIO()
+    write_page_range(source, start_page, end_page, buffer, writer)
+    return buffer.getvalue()
+
+
+def _as_index(index: Union[SplitIndex, Path]) -> SplitIndex:
+    return index if isinstance(index, SplitIndex) else load_split_index(index)
+
+
+def materialize_chapter(
+    index: Union[SplitIndex, Path],
+    chapter: ChapterRef,
+    output_path: Optional[Path] = None,
+    writer: Union[str, PageRangeWriter] = "fitz",
+    overwrite: bool = False,
+) -> Path:
+    """
+    Write one chapter of a split (typically an --index-only one) to its
+    planned file, or to output_path. An existing file is reused unless
+    overwrite is set.
+    """
+    index = _as_index(index)
+    chapter = find_chapter(index, chapter)
+    if output_path is None and chapter.file_path is None:
+        raise ValueError(f"{chapter.title} has no planned file; pass output_path")
+    output_path = Path(output_path or chapter.file_path)
+
+    if output_path.exists() and not overwrite:
+        return output_path
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_output(output_path) as partial:
+        write_page_range(
+            index.source,
+            chapter.start_page,
+            chapter.end_page,
+            partial,
+            writer,
+            expected_pages=index.total_pages,
+        )
+    logger.info(f"Materialized {chapter.title} to {output_path}")
+    return output_path
+
+
+def chapter_bytes(
+    index: Union[SplitIndex, Path],
+    chapter: ChapterRef,
+    writer: Union[str, PageRangeWriter] = "fitz",
+) -> bytes:
+    index = _as_index(index)
+    chapter = find_chapter(index, chapter)
+    buffer = io.BytesIO()
+    write_page_range(
+        index.source,
+        chapter.start_page,
+        chapter.end_page,
+        buffer,
+        writer,
+        expected_pages=index.total_pages,
+    )
+    return buffer.getvalue()
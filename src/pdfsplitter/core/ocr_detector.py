@@ -1,9 +1,9 @@
 import fitz
 from pathlib import Path
-import hashlib
 from typing import Optional
 from ..utils.cache import Cache
-from ..utils.llm import analyze_for_ocr
+from ..utils.fingerprint import fast_fingerprint, file_sha256
+from ..utils.llm import analyze_for_ocr, analyze_many_for_ocr
 from ..constants import MIN_TEXT_CHARS, MAX_SAMPLE_CHARS, SAMPLE_PAGES
 from ..config import settings
 
@@ -25,49 +25,157 @@ def extract_text_sample(
     return ""
 
 
-def needs_ocr(pdf_path: Path, cache: Optional[Cache] = None) -> tuple[bool, str]:
-    doc_hash = hashlib.sha256(pdf_path.read_bytes()).hexdigest()[:16]
-    cache_key = f"ocr_{doc_hash}"
+def find_pages_without_text(
+    pdf_path: Path, min_chars: int = MIN_TEXT_CHARS, window: Optional[int] = None
+) -> list[int]:
+    pages = []
+    with fitz.open(pdf_path) as doc:
+        total_pages = len(doc)
+    step = window or total_pages or 1
 
-    if cache:
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached.get(
-                "needs_ocr", False
-            ), f"Cache hit: {cached.get('reasoning', '')}"
-
-    try:
+    # Each window of pages gets its own handle, so parsed pages are freed as
+    # the scan moves on.
+    for first in range(0, total_pages, step):
         with fitz.open(pdf_path) as doc:
-            num_pages = len(doc)
-            sample_pages = list(range(min(SAMPLE_PAGES, num_pages)))
-
-            samples = []
-            for page_num in sample_pages:
-                text = doc[page_num].get_text("text")
-                samples.append(f"[Page {page_num + 1}]:\n{text[:MAX_SAMPLE_CHARS]}")
+            for page_num in range(first, min(first + step, total_pages)):
+                page = doc[page_num]
+                if is_likely_searchable(page.get_text("text"), min_chars):
+                    continue
+                # Blank pages have nothing to recognise; only image pages need OCR.
+                if page.get_images(full=False):
+                    pages.append(page_num)
+    return pages
 
-            if all(is_likely_searchable(s) for s in samples):
-                result = False
-                reasoning = "Heuristic: all sample pages have sufficient clean text"
 
-                if cache:
-                    cache.set(cache_key, {"needs_ocr": result, "reasoning": reasoning})
+def _cache_keys(pdf_path: Path, fast: bool, sha256: Optional[str] = None):
+    if fast:
+        yield f"ocr_fast_{fast_fingerprint(pdf_path)[:16]}"
+    yield f"ocr_{(sha256 or file_sha256(pdf_path))[:16]}"
 
-                return result, reasoning
 
-            llm_result, llm_reasoning = analyze_for_ocr(samples)
+def _cached_decision(
+    pdf_path: Path, cache: Optional[Cache], fast: bool, sha256: Optional[str] = None
+) -> tuple[Optional[tuple[bool, str]], list[str]]:
+    cache_keys = []
 
-            if llm_result is not None:
-                result = llm_result
-                reasoning = f"{llm_reasoning}"
-            else:
-                result = any(len(s) > 10 for s in samples)
-                reasoning = f"Fallback: {'text detected' if result else 'minimal text'}"
+    if cache:
+        # The full hash is only computed when the fast key misses.
+        for cache_key in _cache_keys(pdf_path, fast, sha256):
+            cache_keys.append(cache_key)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                for missed_key in cache_keys[:-1]:
+                    cache.set(missed_key, cached)
+                return (
+                    cached.get("needs_ocr", False),
+                    f"Cache hit: {cached.get('reasoning', '')}",
+                ), cache_keys
+
+    return None, cache_keys
+
+
+def _store_decision(
+    cache: Optional[Cache], cache_keys: list[str], result: bool, reasoning: str
+):
+    for cache_key in cache_keys:
+        cache.set(cache_key, {"needs_ocr": result, "reasoning": reasoning})
+
+
+def _sample_text(pdf_path: Path) -> list[str]:
+    with fitz.open(pdf_path) as doc:
+        num_pages = len(doc)
+        sample_pages = list(range(min(SAMPLE_PAGES, num_pages)))
+
+        samples = []
+        for page_num in sample_pages:
+            text = doc[page_num].get_text("text")
+            samples.append(f"[Page {page_num + 1}]:\n{text[:MAX_SAMPLE_CHARS]}")
+        return samples
+
+
+def _heuristic_decision(samples: list[str]) -> Optional[tuple[bool, str]]:
+    if all(is_likely_searchable(s) for s in samples):
+        return False, "Heuristic: all sample pages have sufficient clean text"
+    return None
+
+
+def _llm_decision(
+    samples: list[str], llm_result: Optional[bool], llm_reasoning: str
+) -> tuple[bool, str]:
+    if llm_result is not None:
+        return llm_result, f"{llm_reasoning}"
+
+    result = any(len(s) > 10 for s in samples)
+    return result, f"Fallback: {'text detected' if result else 'minimal text'}"
+
+
+def needs_ocr(
+    pdf_path: Path,
+    cache: Optional[Cache] = None,
+    fast: bool = False,
+    sha256: Optional[str] = None,
+) -> tuple[bool, str]:
+    """
+    Whether pdf_path needs OCR, and why. sha256 is the file's hash when the
+    caller already has it, so the cache lookup does not read the file again.
+    """
+    cached, cache_keys = _cached_decision(pdf_path, cache, fast, sha256)
+    if cached is not None:
+        return cached
 
-            if cache:
-                cache.set(cache_key, {"needs_ocr": result, "reasoning": reasoning})
+    try:
+        samples = _sample_text(pdf_path)
+        decision = _heuristic_decision(samples)
+        if decision is None:
+            decision = _llm_decision(samples, *analyze_for_ocr(samples))
 
-            return result, reasoning
+        _store_decision(cache, cache_keys, *decision)
+        return decision
 
     except Exception as e:
         return True, f"Error reading PDF: {str(e)}"
+
+
+def needs_ocr_many(
+    pdf_paths: list[Path],
+    cache: Optional[Cache] = None,
+    fast: bool = False,
+    concurrency: Optional[int] = None,
+    sha256s: Optional[dict[Path, str]] = None,
+) -> list[tuple[bool, str]]:
+    """
+    needs_ocr for many files. Documents the cache and heuristic cannot settle
+    are sent to the LLM concurrently instead of one round-trip at a time.
+    sha256s holds hashes of pdf_paths the caller already has.
+    """
+    sha256s = sha256s or {}
+    decisions: list[Optional[tuple[bool, str]]] = [None] * len(pdf_paths)
+    undecided = []
+
+    for i, pdf_path in enumerate(pdf_paths):
+        cached, cache_keys = _cached_decision(
+            pdf_path, cache, fast, sha256s.get(pdf_path)
+        )
+        if cached is not None:
+            decisions[i] = cached
+            continue
+
+        try:
+            samples = _sample_text(pdf_path)
+        except Exception as e:
+            decisions[i] = True, f"Error reading PDF: {str(e)}"
+            continue
+
+        decision = _heuristic_decision(samples)
+        if decision is None:
+            undecided.append((i, samples, cache_keys))
+        else:
+            _store_decision(cache, cache_keys, *decision)
+            decisions[i] = decision
+
+    llm_results = analyze_many_for_ocr([s for _, s, _ in undecided], concurrency)
+    for (i, samples, cache_keys), llm_result in zip(undecided, llm_results):
+        decisions[i] = _llm_decision(samples, *llm_result)
+        _store_decision(cache, cache_keys, *decisions[i])
+
+    return decisions
@@ -0,0 +1,171 @@
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+import fitz
+from ..config import settings
+from ..utils import get_logger
+
+logger = get_logger(__name__)
+
+OCR_ARGS = ["--deskew", "--clean", "--optimize", "3", "-q"]
+
+
+def run_ocr(
+    input_path: Path,
+    output_path: Path,
+    timeout: Optional[int] = None,
+    threads: Optional[int] = None,
+) -> bool:
+    args = ["ocrmypdf", *OCR_ARGS]
+    if threads:
+        args += ["--jobs", str(threads)]
+
+    try:
+        result = subprocess.run(
+            [*args, str(input_path), str(output_path)],
+            capture_output=True,
+            text=True,
+            timeout=timeout or settings.OCR_TIMEOUT,
+        )
+
+        return result.returncode == 0
+    except subprocess.TimeoutExpired:
+        logger.error(f"OCR timed out: {input_path.name}")
+        return False
+    except Exception as e:
+        logger.error(f"OCR failed: {e}")
+        return False
+
+
+def page_runs(pages: list[int]) -> list[tuple[int, int]]:
+    runs = []
+    for page in sorted(set(pages)):
+        if runs and runs[-1][1] == page - 1:
+            runs[-1] = (runs[-1][0], page)
+        else:
+            runs.append((page, page))
+    return runs
+
+
+def splice_pages(
+    original: fitz.Document,
+    replacements: fitz.Document,
+    pages: list[int],
+    output_path: Path,
+):
+    """
+    Write original with each page in pages replaced, in order, by the
+    corresponding page of replacements. Outline and metadata are kept.
+    """
+    replaced = {page: i for i, page in enumerate(sorted(set(pages)))}
+
+    with fitz.open() as out:
+        start = 0
+        for first, last in page_runs(list(replaced)):
+            if first > start:
+                out.insert_pdf(original, from_page=start, to_page=first - 1)
+            out.insert_pdf(
+                replacements, from_page=replaced[first], to_page=replaced[last]
+            )
+            start = last + 1
+        if start < len(original):
+            out.insert_pdf(original, from_page=start, to_page=len(original) - 1)
+
+        out.set_toc(original.get_toc(simple=False))
+        out.set_metadata(original.metadata)
+        out.save(output_path, garbage=1, deflate=True)
+
+
+def _run_shard(input_path: Path, output_path: Path, timeout: int, retries: int) -> bool:
+    for attempt in range(retries + 1):
+        if attempt:
+            logger.info(f"Retrying OCR shard {input_path.name} ({attempt}/{retries})")
+        # Shards already run in parallel, so each ocrmypdf gets a single thread.
+        if run_ocr(input_path, output_path, timeout=timeout, threads=1):
+            return True
+    return False
+
+
+def run_ocr_on_pages(
+    input_path: Path,
+    output_path: Path,
+    pages: list[int],
+    shard_pages: Optional[int] = None,
+    jobs: Optional[int] = None,
+    timeout: Optional[int] = None,
+    retries: Optional[int] = None,
+) -> bool:
+    """
+    OCR the given pages in shards of shard_pages, running up to jobs
+    ocrmypdf processes at once, and splice the results into output_path.
+    A failed shard leaves only its own pages without OCR. Returns False
+    when no shard succeeded.
+    """
+    pages = sorted(set(pages))
+    shard_pages = shard_pages or settings.OCR_SHARD_PAGES
+    jobs = jobs or settings.OCR_JOBS
+    timeout = timeout or settings.OCR_TIMEOUT
+    retries = settings.OCR_RETRIES if retries is None else retries
+
+    shards = [pages[i : i + shard_pages] for i in range(0, len(pages), shard_pages)]
+
+    with tempfile.TemporaryDirectory(prefix="pdfsplitter_ocr_") as tmp:
+        with fitz.open(input_path) as doc:
+            shard_paths = []
+            for i, shard in enumerate(shards):
+                shard_in = Path(tmp) / f"shard_{i:04d}.pdf"
+                shard_out = Path(tmp) / f"shard_{i:04d}_ocr.pdf"
+                with fitz.open() as selected:
+                    for first, last in page_runs(shard):
+                        selected.insert_pdf(doc, from_page=first, to_page=last)
+                    selected.save(shard_in)
+                shard_paths.append((shard_in, shard_out))
+
+            logger.info(
+                f"OCR: {len(pages)} pages in {len(shards)} shards, {jobs} at a time"
+            )
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                outcomes = list(
+                    pool.map(
+                        lambda paths: _run_shard(*paths, timeout, retries), shard_paths
+                    )
+                )
+
+            ocr_pages = []
+            with fitz.open() as replacements:
+                for shard, (_, shard_out), ok in zip(shards, shard_paths, outcomes):
+                    if ok:
+                        with fitz.open(shard_out) as ocr_doc:
+                            ok = len(ocr_doc) == len(shard)
+                            if ok:
+                                replacements.insert_pdf(ocr_doc)
+                    if ok:
+                        ocr_pages.extend(shard)
+                    else:
+                        logger.warning(
+                            f"OCR failed for pages {shard[0] + 1}-{shard[-1] + 1}, "
+                            f"keeping them without OCR"
+                        )
+
+                if not ocr_pages:
+                    return False
+
+                splice_pages(doc, replacements, ocr_pages, output_path)
+
+    return True
+
+
+def ocr_document(
+    input_path: Path, output_path: Path, jobs: Optional[int] = None
+) -> bool:
+    with fitz.open(input_path) as doc:
+        total_pages = len(doc)
+
+    if total_pages <= settings.OCR_SHARD_PAGES:
+        return run_ocr(input_path, output_path)
+
+    return run_ocr_on_pages(
+        input_path, output_path, list(range(total_pages)), jobs=jobs
+    )
@@ -0,0 +1,179 @@
+from collections import Counter
+from typing import Callable, Optional
+import re
+import fitz
+from ..constants import HEADER_REGION
+
+HEAD_LINES = 15
+
+# Pages sampled, evenly spread, to find a running header, and the share of
+# them whose header region must open with it.
+RUNNING_HEADER_SAMPLE = 9
+RUNNING_HEADER_SHARE = 2 / 3
+
+# Header text only feeds line matching, so whitespace normalisation and
+# unknown-glyph handling are skipped; ligatures pass through unexpanded.
+HEADER_TEXT_FLAGS = fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP
+
+
+def get_page_content_length(page_text: str) -> int:
+    cleaned = "".join(c for c in page_text if c.isalnum() or c.isspace())
+    return len(cleaned.strip())
+
+
+def _header_key(line: str) -> str:
+    # Page numbers in a running header change from page to page.
+    return re.sub(r"\d+", "#", line)
+
+
+class PageTextIndex:
+    """
+    Lazily extracted per-page text for an open fitz document.
+    Each page is extracted at most once and shared by every detection stage.
+    Head lines come from the top header_region of the page only, without
+    the document's running header if it has one. Pages whose region is
+    empty, or holds nothing but the running header, fall back to the full
+    text so a heading set lower on the page is still seen; None reads full
+    pages. full_reads counts the full page texts extracted.
+
+    With a window, full text is only kept until `window` more pages have
+    been read; then on_window (or release) runs and only head lines and
+    content lengths survive.
+    """
+
+    def __init__(
+        self,
+        doc,
+        head_lines: int = HEAD_LINES,
+        header_region: Optional[float] = HEADER_REGION,
+        window: Optional[int] = None,
+        on_window: Optional[Callable[[], None]] = None,
+    ):
+        self.doc = doc
+        self.head_size = head_lines
+        self.header_region = header_region
+        self.window = window
+        self.on_window = on_window
+        self._loaded = 0
+        self._text: dict[int, str] = {}
+        self._head: dict[int, list[str]] = {}
+        self._content_length: dict[int, int] = {}
+        self._clipped: dict[int, list[str]] = {}
+        self._running_header: Optional[str] = None
+        self._header_sampled = False
+        self.full_reads = 0
+        # Set to a set by the profiler to record which pages a stage reads.
+        self.touched: Optional[set[int]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc)
+
+    def text(self, page_num: int, keep: bool = True) -> str:
+        """Full page text; with keep=False a page not read yet is not cached."""
+        if self.touched is not None:
+            self.touched.add(page_num)
+        text = self._text.get(page_num)
+        if text is None:
+            text = self._page(page_num).get_text("text")
+            self.full_reads += 1
+            if keep:
+                self._text[page_num] = text
+        return text
+
+    def head_lines(self, page_num: int, count: Optional[int] = None) -> list[str]:
+        count = self.head_size if count is None else count
+        if self.touched is not None:
+            self.touched.add(page_num)
+        if count > self.head_size:
+            return [line.strip() for line in self.text(page_num).split("\n")[:count]]
+
+        head = self._head.get(page_num)
+        if head is None:
+            head = self._header_lines(page_num)
+            self._head[page_num] = head
+        return head[:count]
+
+    def _header_lines(self, page_num: int) -> list[str]:
+        if not self.header_region:
+            return self._lines(self.text(page_num))
+        header = self.running_header()
+        head = self._clipped.pop(page_num, None)
+        if head is None:
+            head = self._region_lines(page_num)
+        if head and _header_key(head[0]) == header:
+            head = head[1:]
+        if not any(head):
+            # Full text keeps content order, where the header may come last.
+            head = [
+                line
+                for line in self._lines(self.text(page_num), self.head_size + 1)
+                if _header_key(line) != header
+            ]
+        return head[: self.head_size]
+
+    def running_header(self) -> Optional[str]:
+        """
+        Digit-normalised first line shared by most sampled header regions.
+        """
+        if not self._header_sampled:
+            self._header_sampled = True
+            total = len(self.doc)
+            step = max(total // RUNNING_HEADER_SAMPLE, 1)
+            sample = range(0, total, step)[:RUNNING_HEADER_SAMPLE]
+            firsts = Counter()
+            for page_num in sample:
+                if page_num not in self._head:
+                    lines = self._region_lines(page_num)
+                    self._clipped[page_num] = lines
+                    if lines and lines[0]:
+                        firsts[_header_key(lines[0])] += 1
+            if firsts and len(sample) >= 3:
+                line, count = firsts.most_common(1)[0]
+                if count >= len(sample) * RUNNING_HEADER_SHARE:
+                    self._running_header = line
+        return self._running_header
+
+    def _region_lines(self, page_num: int) -> list[str]:
+        page = self._page(page_num)
+        rect = page.rect
+        clip = fitz.Rect(
+            rect.x0, rect.y0, rect.x1, rect.y0 + rect.height * self.header_region
+        )
+        blocks = page.get_text("blocks", clip=clip, flags=HEADER_TEXT_FLAGS)
+        # Blocks sorted top to bottom put a running header first; one more
+        # line than a head is kept for it to drop.
+        text = "".join(block[4] for block in sorted(blocks, key=lambda b: (b[1], b[0])))
+        return self._lines(text, self.head_size + 1)
+
+    def _lines(self, text: str, count: Optional[int] = None) -> list[str]:
+        count = self.head_size if count is None else count
+        return [line.strip() for line in text.split("\n")[:count]]
+
+    def _page(self, page_num: int):
+        if self.window:
+            if self._loaded >= self.window:
+                (self.on_window or self.release)()
+            self._loaded += 1
+        return self.doc[page_num]
+
+    def release(self, doc=None):
+        """Drop cached full text, switching to `doc` if the document was reopened."""
+        if doc is not None:
+            self.doc = doc
+        self._text.clear()
+        self._loaded = 0
+
+    def content_length(self, page_num: int) -> int:
+        if self.touched is not None:
+            self.touched.add(page_num)
+        length = self._content_length.get(page_num)
+        if length is None:
+            length = get_page_content_length(self.text(page_num))
+            self._content_length[page_num] = length
+        return length
+
+
+def as_page_index(doc) -> PageTextIndex:
+    if isinstance(doc, PageTextIndex):
+        return doc
+    return PageTextIndex(doc)
@@ -1,22 +1,30 @@
 import re
 import json
 from pathlib import Path
-from typing import Optional, List
-from dataclasses import dataclass
-from PyPDF2 import PdfReader, PdfWriter
-import fitz
+from typing import Iterator, Optional, List, Union
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
 from .models import Chapter, SplitResult
+from .page_index import PageTextIndex, as_page_index
+
+# Defined here before the page index existed; kept for existing importers.
+from .page_index import get_page_content_length  # noqa: F401
+from .session import DocumentSession, open_session
+from .writers import PageRangeWriter, get_writer, iter_write_chapters
+from .heading_rules import CHAPTER_NUMBER_PATTERN, HEADING_RULES
+from .chapter_text import write_chapter_text
+from .incremental import OutputPlan, atomic_output, plan_outputs, remove_stale
+from .streaming import SplitStream
 from ..constants import (
-    CHAPTER_PATTERNS,
-    CHAPTER_IGNORE_PATTERNS,
-    TOC_HEADER_PATTERNS,
-    TOC_ENTRY_PATTERNS,
-    POSTTEXT_MARKER_PATTERNS,
-    MIN_CHAPTER_TITLE_LENGTH,
-    MIN_PAGE_CONTENT_LENGTH,
+    DETECTOR_VERSION,
     MIN_PAGES_BETWEEN_CHAPTERS,
+    TEXT_FORMATS,
+    TOC_VERIFY_MAX_MISSES,
+    TOC_VERIFY_WINDOW,
 )
-from ..utils import get_logger
+from ..utils import Cache, get_logger
+from ..utils.fingerprint import file_sha256
+from ..utils.profiling import NULL_PROFILER, Profiler
 
 logger = get_logger(__name__)
 
@@ -43,42 +51,42 @@ CHAPTER_ONLY_PATTERN = re.compile(r"^CHAPTER\s+(\d+)$", re.IGNORECASE)
 
 
 def is_ignored_pattern(text: str) -> bool:
-    for pattern in CHAPTER_IGNORE_PATTERNS:
-        if pattern.match(text.strip()):
-            return True
-    return False
-
-
-def get_page_content_length(page_text: str) -> int:
-    cleaned = "".join(c for c in page_text if c.isalnum() or c.isspace())
-    return len(cleaned.strip())
+    return HEADING_RULES.is_ignored(text.strip())
 
 
 def is_chapter_only(title: str) -> bool:
     return bool(CHAPTER_ONLY_PATTERN.match(title.strip()))
 
 
-def extract_toc_from_pdf(pdf_path: Path) -> List[TOCEntry]:
+def extract_toc_from_pdf(pdf_path: Union[Path, DocumentSession]) -> List[TOCEntry]:
+    try:
+        with open_session(pdf_path) as session:
+            return _extract_toc(session.pages)
+    except Exception as e:
+        logger.error(f"Error extracting TOC: {e}")
+        return []
+
+
+def _extract_toc(index: PageTextIndex) -> List[TOCEntry]:
     toc_entries = []
 
     try:
-        with fitz.open(pdf_path) as doc:
-            pdf_toc = doc.get_toc()
-
-            if pdf_toc:
-                for entry in pdf_toc:
-                    level, title, page_num = entry[:3]
-                    toc_entries.append(
-                        TOCEntry(
-                            level=level,
-                            title=title,
-                            page_num=page_num - 1,
-                            source="pdf_toc",
-                        )
+        pdf_toc = index.doc.get_toc()
+
+        if pdf_toc:
+            for entry in pdf_toc:
+                level, title, page_num = entry[:3]
+                toc_entries.append(
+                    TOCEntry(
+                        level=level,
+                        title=title,
+                        page_num=page_num - 1,
+                        source="pdf_toc",
                     )
+                )
 
-            if not toc_entries:
-                toc_entries = find_toc_by_text_search(doc)
+        if not toc_entries:
+            toc_entries = find_toc_by_text_search(index)
 
     except Exception as e:
         logger.error(f"Error extracting TOC: {e}")
@@ -87,93 +95,86 @@ def extract_toc_from_pdf(pdf_path: Path) -> List[TOCEntry]:
 
 
 def find_toc_by_text_search(doc) -> List[TOCEntry]:
+    index = as_page_index(doc)
     toc_entries = []
 
-    for page_num, page in enumerate(doc):
-        text = page.get_text("text")
-        if not text:
+    for page_num in range(len(index)):
+        head = index.head_lines(page_num, 5)
+        if not any(head):
             continue
 
-        first_lines = " ".join(text.split("\n")[:5]).lower()
+        first_lines = " ".join(head).lower()
 
-        is_toc_page = any(
-            pattern.search(first_lines) for pattern in TOC_HEADER_PATTERNS
-        )
-
-        if is_toc_page:
-            lines = page.get_text("text").split("\n")
+        if HEADING_RULES.is_toc_header(first_lines):
+            lines = index.text(page_num).split("\n")
 
             for line in lines:
                 line = line.strip()
                 if len(line) < 5 or len(line) > 150:
                     continue
 
-                for pattern in TOC_ENTRY_PATTERNS:
-                    match = pattern.match(line)
-                    if match:
-                        try:
-                            chapter_num = int(match.group(1))
-                            chapter_title = match.group(2).strip()
-                            referenced_page = int(match.group(3))
-
-                            toc_entries.append(
-                                TOCEntry(
-                                    level=1,
-                                    title=f"CHAPTER {chapter_num}",
-                                    page_num=referenced_page - 1,
-                                    raw_title=chapter_title,
-                                    source="text_toc",
-                                )
-                            )
-                            break
-                        except (ValueError, IndexError):
-                            continue
+                match = HEADING_RULES.match_toc_entry(line)
+                if match:
+                    chapter_num, chapter_title, referenced_page = match
+                    toc_entries.append(
+                        TOCEntry(
+                            level=1,
+                            title=f"CHAPTER {int(chapter_num)}",
+                            page_num=int(referenced_page) - 1,
+                            raw_title=chapter_title.strip(),
+                            source="text_toc",
+                        )
+                    )
 
     return toc_entries
 
 
-def detect_page_offset(toc_entries: List[TOCEntry], pdf_path: Path) -> int:
-    with fitz.open(pdf_path) as doc:
-        total_pages = len(doc)
+def detect_page_offset(
+    toc_entries: List[TOCEntry], pdf_path: Union[Path, DocumentSession]
+) -> int:
+    if not toc_entries:
+        return 0
 
-        if not toc_entries:
-            return 0
-
-        first_chapter = next(
-            (
-                e
-                for e in toc_entries
-                if "chapter" in e.title.lower() and re.search(r"\d+", e.title)
-            ),
-            None,
-        )
+    with open_session(pdf_path) as session:
+        return _detect_page_offset(toc_entries, session.pages)
 
-        if not first_chapter:
-            return 0
 
-        toc_page = first_chapter.page_num
+def _find_chapter_heading(
+    index: PageTextIndex, chapter_num: int, pages, lines: int = 15
+) -> Optional[tuple[int, str]]:
+    for page_num in pages:
+        for line in index.head_lines(page_num, lines):
+            match = CHAPTER_NUMBER_PATTERN.match(line)
+            if match and int(match.group(1)) == chapter_num:
+                return page_num, line
+    return None
 
-        chapter_pattern = re.compile(
-            r"^\s*CHAPTER\s+(\d+)\b", re.IGNORECASE | re.MULTILINE
-        )
 
-        for search_page in range(toc_page, min(toc_page + 15, total_pages)):
-            page = doc[search_page]
-            text = page.get_text("text")
+def _detect_page_offset(toc_entries: List[TOCEntry], index: PageTextIndex) -> int:
+    total_pages = len(index)
 
-            for line in text.split("\n")[:15]:
-                line = line.strip()
-                match = chapter_pattern.match(line)
-                if match:
-                    chapter_num = int(match.group(1))
-                    expected_match = re.search(r"(\d+)", first_chapter.title)
-                    if expected_match:
-                        expected_num = int(expected_match.group(1))
+    first_chapter = next(
+        (
+            e
+            for e in toc_entries
+            if "chapter" in e.title.lower() and re.search(r"\d+", e.title)
+        ),
+        None,
+    )
+
+    if not first_chapter:
+        return 0
 
-                        if chapter_num == expected_num:
-                            offset = search_page - toc_page
-                            logger.info(f"Detected page offset: {offset}")
-                            return offset
+    toc_page = first_chapter.page_num
+    expected_num = int(re.search(r"(\d+)", first_chapter.title).group(1))
+
+    found = _find_chapter_heading(
+        index, expected_num, range(toc_page, min(toc_page + 15, total_pages))
+    )
+    if found:
+        offset = found[0] - toc_page
+        logger.info(f"Detected page offset: {offset}")
+        return offset
 
     return 0
 
@@ -196,50 +197,113 @@ def apply_offset_to_toc(toc_entries: List[TOCEntry], offset: int) -> List[TOCEnt
     return adjusted
 
 
+def _chapter_candidate(
+    index: PageTextIndex, page_num: int, line: str
+) -> Optional[ChapterCandidate]:
+    if len(line) < 5 or len(line) > 60:
+        return None
+    if HEADING_RULES.classify(line) != "chapter":
+        return None
+
+    confidence = 0.85
+    if index.content_length(page_num) > 500:
+        confidence += 0.1
+
+    return ChapterCandidate(
+        page_num=page_num,
+        title=line.upper(),
+        confidence=min(confidence, 1.0),
+        source="text",
+    )
+
+
 def detect_chapters_by_text(doc) -> List[ChapterCandidate]:
     candidates = []
 
-    chapter_pattern = re.compile(
-        r"^\s*(CHAPTER\s+\d+)\s*$", re.IGNORECASE | re.MULTILINE
-    )
+    index = as_page_index(doc)
 
-    for page_num, page in enumerate(doc):
-        text = page.get_text("text")
-        if not text:
-            continue
+    for page_num in range(len(index)):
+        for line in index.head_lines(page_num, 12):
+            candidate = _chapter_candidate(index, page_num, line)
+            if candidate:
+                candidates.append(candidate)
 
-        lines = text.split("\n")
+    return candidates
 
-        for line in lines[:12]:
-            line = line.strip()
 
-            if len(line) < 5 or len(line) > 60:
-                continue
+def verify_toc_chapters(
+    toc_entries: List[TOCEntry],
+    doc,
+    window: int = TOC_VERIFY_WINDOW,
+    max_misses: float = TOC_VERIFY_MAX_MISSES,
+) -> Optional[List[ChapterCandidate]]:
+    """
+    Look for each TOC chapter's heading within `window` pages of its target
+    instead of scanning the whole document. Entries whose heading is not
+    found are kept as TOC candidates. Returns None, meaning the TOC should
+    not be trusted, once more than max_misses of the entries are
+    unconfirmed or when chapter headings follow the last TOC chapter.
+    """
+    index = as_page_index(doc)
+    total_pages = len(index)
+    allowed_misses = int(len(toc_entries) * max_misses)
+    candidates = []
+    misses = 0
 
-            if is_ignored_pattern(line):
-                continue
+    for entry in toc_entries:
+        chapter_num = int(CHAPTER_ONLY_PATTERN.match(entry.title.strip()).group(1))
+        # Nearest pages first, so an exact TOC target wins over a neighbour.
+        pages = [
+            p
+            for distance in range(window + 1)
+            for p in dict.fromkeys(
+                (entry.page_num + distance, entry.page_num - distance)
+            )
+            if 0 <= p < total_pages
+        ]
 
-            match = chapter_pattern.match(line)
-            if match:
-                title = match.group(1).strip().upper()
+        found = _find_chapter_heading(index, chapter_num, pages, lines=12)
+        candidate = found and _chapter_candidate(index, *found)
+        if candidate:
+            candidates.append(candidate)
+            continue
 
-                page_content_length = get_page_content_length(text)
-                confidence = 0.85
-                if page_content_length > 500:
-                    confidence += 0.1
+        misses += 1
+        if misses > allowed_misses:
+            logger.info(
+                f"TOC chapter {chapter_num} not found near page {entry.page_num}, "
+                f"{misses} of {len(toc_entries)} unconfirmed"
+            )
+            return None
+        candidates.append(
+            ChapterCandidate(
+                page_num=entry.page_num,
+                title=entry.title,
+                confidence=0.95,
+                source="toc",
+            )
+        )
 
-                candidates.append(
-                    ChapterCandidate(
-                        page_num=page_num,
-                        title=title,
-                        confidence=min(confidence, 1.0),
-                        source="text",
-                    )
-                )
+    if _has_headings_after(index, max(c.page_num for c in candidates)):
+        logger.info("Chapter headings found after the last TOC chapter")
+        return None
 
     return candidates
 
 
+def _has_headings_after(index: PageTextIndex, last_chapter_page: int) -> bool:
+    # Stops at the first posttext marker; posttext detection reads these
+    # pages anyway, so a complete TOC costs only the final chapter.
+    for page_num in range(last_chapter_page + 1, len(index)):
+        for line in index.head_lines(page_num, 12):
+            kind = HEADING_RULES.classify(line)
+            if kind == "posttext":
+                return False
+            if kind == "chapter" and _chapter_candidate(index, page_num, line):
+                return True
+    return False
+
+
 def merge_toc_with_text_detection(
     toc_entries: List[TOCEntry], text_candidates: List[ChapterCandidate]
 ) -> List[ChapterCandidate]:
@@ -295,47 +359,40 @@ def deduplicate_candidates(
 
 
 def detect_chapter_boundaries(
-    candidates: List[ChapterCandidate], total_pages: int, pdf_path: Path
+    candidates: List[ChapterCandidate],
+    total_pages: int,
+    pdf_path: Union[Path, DocumentSession],
 ) -> List[ChapterCandidate]:
-    with fitz.open(pdf_path) as doc:
-        for i, candidate in enumerate(candidates):
-            if candidate.end_page is not None:
-                continue
+    with open_session(pdf_path) as session:
+        return _detect_chapter_boundaries(candidates, total_pages, session.pages)
 
-            if i + 1 < len(candidates):
-                candidate.end_page = candidates[i + 1].page_num - 1
+
+def _detect_chapter_boundaries(
+    candidates: List[ChapterCandidate], total_pages: int, index: PageTextIndex
+) -> List[ChapterCandidate]:
+    for i, candidate in enumerate(candidates):
+        if candidate.end_page is not None:
+            continue
+
+        if i + 1 < len(candidates):
+            candidate.end_page = candidates[i + 1].page_num - 1
+        else:
+            posttext_start = detect_posttext_start_page(index, candidate.page_num)
+            if posttext_start > candidate.page_num:
+                candidate.end_page = posttext_start - 1
             else:
-                posttext_start = detect_posttext_start_page(doc, candidate.page_num)
-                if posttext_start > candidate.page_num:
-                    candidate.end_page = posttext_start - 1
-                else:
-                    candidate.end_page = total_pages - 1
+                candidate.end_page = total_pages - 1
 
     return candidates
 
 
 def detect_posttext_start_page(doc, start_page: int) -> int:
-    total_pages = len(doc)
+    index = as_page_index(doc)
+    total_pages = len(index)
 
     for page_num in range(start_page + 10, total_pages):
-        page = doc[page_num]
-        text = page.get_text("text")
-        lines = text.split("\n")
-
-        for line in lines[:10]:
-            line_stripped = line.strip()
-            if not line_stripped:
-                continue
-
-            for pattern in POSTTEXT_MARKER_PATTERNS:
-                if pattern.search(line_stripped):
-                    return page_num
-
-            references_pattern = re.compile(
-                r"^(?:REFERENCES|BIBLIOGRAPHY|APPENDIX|INDEX|NOTES|GLOSSARY|AFTERWORD|EPILOGUE)\s*$",
-                re.IGNORECASE | re.MULTILINE,
-            )
-            if references_pattern.match(line_stripped):
+        for line_stripped in index.head_lines(page_num, 10):
+            if line_stripped and HEADING_RULES.is_posttext_marker(line_stripped):
                 return page_num
 
     return total_pages
@@ -370,18 +427,7 @@ def is_posttext_start(text: str, page_num: int, last_chapter_start: int) -> bool
 
     for line in lines[:10]:
         line_stripped = line.strip()
-        if not line_stripped:
-            continue
-
-        for pattern in POSTTEXT_MARKER_PATTERNS:
-            if pattern.search(line_stripped):
-                return True
-
-        references_pattern = re.compile(
-            r"^(?:REFERENCES|BIBLIOGRAPHY|APPENDIX|INDEX|NOTES|GLOSSARY|AFTERWORD|EPILOGUE)\s*$",
-            re.IGNORECASE | re.MULTILINE,
-        )
-        if references_pattern.match(line_stripped):
+        if line_stripped and HEADING_RULES.is_posttext_marker(line_stripped):
             return True
 
     meaningful_lines = [l for l in text.split("\n") if len(l.strip()) > 30]
@@ -391,45 +437,59 @@ def is_posttext_start(text: str, page_num: int, last_chapter_start: int) -> bool
     return False
 
 
-def detect_posttext(pdf_path: Path, last_chapter_end: int) -> tuple[int, int]:
-    with fitz.open(pdf_path) as doc:
-        total_pages = len(doc)
+def detect_posttext(
+    pdf_path: Union[Path, DocumentSession], last_chapter_end: int
+) -> tuple[int, int]:
+    with open_session(pdf_path) as session:
+        return _detect_posttext(session.pages, last_chapter_end)
 
-        for page_num in range(last_chapter_end + 1, total_pages):
-            page = doc[page_num]
-            text = page.get_text("text")
 
-            if is_posttext_start(text, page_num, last_chapter_end):
-                logger.info(f"Detected posttext starting at page {page_num}")
-                return (page_num, total_pages - 1)
+def _detect_posttext(index: PageTextIndex, last_chapter_end: int) -> tuple[int, int]:
+    total_pages = len(index)
 
-        return (last_chapter_end + 1, total_pages - 1)
+    for page_num in range(last_chapter_end + 1, total_pages):
+        text = index.text(page_num)
 
+        if is_posttext_start(text, page_num, last_chapter_end):
+            logger.info(f"Detected posttext starting at page {page_num}")
+            return (page_num, total_pages - 1)
 
-def split_pdf(pdf_path: Path, output_dir: Path) -> SplitResult:
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    return (last_chapter_end + 1, total_pages - 1)
 
-    logger.info(f"Processing: {pdf_path}")
 
+def detect_chapter_candidates(session: DocumentSession) -> List[ChapterCandidate]:
+    index = session.pages
+    profiler = session.profiler
     candidates = []
 
-    with fitz.open(pdf_path) as doc:
-        toc_entries = extract_toc_from_pdf(pdf_path)
+    with profiler.stage("toc", index):
+        toc_entries = extract_toc_from_pdf(session)
+
+    if toc_entries:
+        logger.info(f"Found {len(toc_entries)} TOC entries")
 
-        if toc_entries:
-            logger.info(f"Found {len(toc_entries)} TOC entries")
+        toc_chapters = [e for e in toc_entries if is_chapter_only(e.title)]
+        logger.info(f"Found {len(toc_chapters)} CHAPTER entries in TOC")
 
-            toc_chapters = [e for e in toc_entries if is_chapter_only(e.title)]
-            logger.info(f"Found {len(toc_chapters)} CHAPTER entries in TOC")
+        with profiler.stage("offset", index):
+            offset = detect_page_offset(toc_chapters, session)
 
-            offset = detect_page_offset(toc_chapters, pdf_path)
+        if offset > 0:
+            toc_chapters = apply_offset_to_toc(toc_chapters, offset)
+            logger.info(f"Applied page offset: {offset}")
 
-            if offset > 0:
-                toc_chapters = apply_offset_to_toc(toc_chapters, offset)
-                logger.info(f"Applied page offset: {offset}")
+        candidates = None
+        if toc_chapters:
+            with profiler.stage("toc_verify", index):
+                candidates = verify_toc_chapters(toc_chapters, index)
 
-            text_candidates = detect_chapters_by_text(doc)
+        if candidates is not None:
+            logger.info(
+                f"Verified {len(toc_chapters)} TOC chapters, skipping full text scan"
+            )
+        else:
+            with profiler.stage("text_scan", index):
+                text_candidates = detect_chapters_by_text(index)
 
             if text_candidates:
                 logger.info(
@@ -448,67 +508,46 @@ def split_pdf(pdf_path: Path, output_dir: Path) -> SplitResult:
                     )
                     for entry in toc_chapters
                 ]
-        else:
-            logger.info("No TOC found, using text-based detection")
-            candidates = detect_chapters_by_text(doc)
+    else:
+        logger.info("No TOC found, using text-based detection")
+        with profiler.stage("text_scan", index):
+            candidates = detect_chapters_by_text(index)
 
     candidates = deduplicate_candidates(candidates)
     logger.info(f"Found {len(candidates)} chapter candidates after deduplication")
 
-    reader = PdfReader(pdf_path)
-    total_pages = len(reader.pages)
+    return candidates
 
-    if not candidates:
-        chapter_path = output_dir / "chapter_01.pdf"
-        writer = PdfWriter()
-        for page in reader.pages:
-            writer.add_page(page)
-        writer.write(chapter_path)
-
-        chapter = Chapter(
-            title="Complete Document",
-            start_page=0,
-            end_page=total_pages - 1,
-            file_path=chapter_path,
-        )
 
-        metadata = {
-            "original_file": str(pdf_path),
-            "total_pages": total_pages,
-            "chapters": [
-                {
-                    "title": chapter.title,
-                    "start_page": chapter.start_page,
-                    "end_page": chapter.end_page,
-                    "file_path": str(chapter_path),
-                }
-            ],
-        }
-        (output_dir / "metadata.json").write_text(json.dumps(metadata, indent=2))
-
-        return SplitResult(
-            original=pdf_path, chapters=[chapter], pretext=None, posttext=None
-        )
+def plan_sections(
+    session: DocumentSession, candidates: List[ChapterCandidate], output_dir: Path
+) -> List[Chapter]:
+    total_pages = session.page_count
 
-    candidates = detect_chapter_boundaries(candidates, total_pages, pdf_path)
+    if not candidates:
+        return [
+            Chapter(
+                title="Complete Document",
+                start_page=0,
+                end_page=total_pages - 1,
+                file_path=output_dir / "chapter_01.pdf",
+            )
+        ]
+
+    with session.profiler.stage("boundaries", session.pages):
+        candidates = detect_chapter_boundaries(candidates, total_pages, session)
     candidates = sorted(candidates, key=lambda c: c.page_num)
 
     chapters = []
     first_chapter_page = candidates[0].page_num
 
     if first_chapter_page > 0:
-        pretext_path = output_dir / "pretext.pdf"
-        writer = PdfWriter()
-        for i in range(first_chapter_page):
-            writer.add_page(reader.pages[i])
-        writer.write(pretext_path)
-
         chapters.append(
             Chapter(
                 title="Pre-text",
                 start_page=0,
                 end_page=first_chapter_page - 1,
-                file_path=pretext_path,
+                file_path=output_dir / "pretext.pdf",
             )
         )
 
@@ -520,62 +559,354 @@ def split_pdf(pdf_path: Path, output_dir: Path) -> SplitResult:
         if end_page < start_page:
             end_page = start_page
 
-        chapter_path = output_dir / f"chapter_{chapter_num:02d}.pdf"
-        writer = PdfWriter()
-        for p in range(start_page, end_page + 1):
-            writer.add_page(reader.pages[p])
-        writer.write(chapter_path)
-
         chapters.append(
             Chapter(
                 title=candidate.title,
                 start_page=start_page,
                 end_page=end_page,
-                file_path=chapter_path,
+                file_path=output_dir / f"chapter_{chapter_num:02d}.pdf",
             )
         )
         chapter_num += 1
 
     last_chapter = chapters[-1] if chapters else None
     if last_chapter and last_chapter.end_page < total_pages - 1:
-        posttext_start, posttext_end = detect_posttext(pdf_path, last_chapter.end_page)
+        with session.profiler.stage("posttext", session.pages):
+            posttext_start, posttext_end = detect_posttext(
+                session, last_chapter.end_page
+            )
 
         if posttext_start <= posttext_end and posttext_start < total_pages:
-            posttext_path = output_dir / "posttext.pdf"
-            writer = PdfWriter()
-            for i in range(posttext_start, posttext_end + 1):
-                writer.add_page(reader.pages[i])
-            writer.write(posttext_path)
-
             chapters.append(
                 Chapter(
                     title="Post-text",
                     start_page=posttext_start,
                     end_page=posttext_end,
-                    file_path=posttext_path,
+                    file_path=output_dir / "posttext.pdf",
                 )
             )
 
+    return chapters
+
+
+def _plan_cache_key(session: DocumentSession, fast_fingerprint: bool) -> str:
+    # Extra heading rule sets change the detected chapters, so they are part
+    # of the key.
+    return (
+        f"plan_{session.fingerprint(fast_fingerprint)[:16]}_v{DETECTOR_VERSION}"
+        f"_{HEADING_RULES.signature}"
+    )
+
+
+def detect_plan(
+    session: DocumentSession,
+    output_dir: Path,
+    cache: Optional[Cache] = None,
+    fast_fingerprint: bool = False,
+) -> List[Chapter]:
+    cache_key = None
+
+    if cache:
+        cache_key = _plan_cache_key(session, fast_fingerprint)
+        cached = cache.get(cache_key)
+        if cached is not None and cached.get("total_pages") == session.page_count:
+            logger.info("Detection plan cache hit, skipping detection")
+            return [
+                Chapter(
+                    title=s["title"],
+                    start_page=s["start_page"],
+                    end_page=s["end_page"],
+                    file_path=output_dir / s["file_name"],
+                )
+                for s in cached["sections"]
+            ]
+
+    candidates = detect_chapter_candidates(session)
+    chapters = plan_sections(session, candidates, output_dir)
+
+    if cache_key:
+        cache.set(
+            cache_key,
+            {
+                "total_pages": session.page_count,
+                "sections": [
+                    {
+                        "title": c.title,
+                        "start_page": c.start_page,
+                        "end_page": c.end_page,
+                        "file_name": c.file_path.name,
+                    }
+                    for c in chapters
+                ],
+            },
+        )
+
+    return chapters
+
+
+def write_metadata(
+    output_dir: Path,
+    pdf_path: Path,
+    total_pages: int,
+    chapters: List[Chapter],
+    index_only: bool = False,
+    source_fingerprint: Optional[str] = None,
+    hashes: Optional[dict[str, str]] = None,
+    text_format: Optional[str] = None,
+    text_files: Optional[List[Chapter]] = None,
+):
+    # file_name is the planned chapter file; in index-only mode nothing is
+    # written there until materialize_chapter asks for it. hashes maps the
+    # names of files on disk, chapter PDFs and text exports alike, to their
+    # sha256 for the next incremental split.
+    hashes = hashes or {}
+
+    def written(c: Chapter) -> bool:
+        return bool(c.file_path) and (not index_only or c.file_path.name in hashes)
+
     metadata = {
-        "original_file": str(pdf_path),
+        # Absolute, so chapters can be materialized from any directory.
+        "original_file": str(Path(pdf_path).resolve()),
         "total_pages": total_pages,
+        "index_only": index_only,
+        "source_fingerprint": source_fingerprint,
         "chapters": [
             {
                 "title": c.title,
                 "start_page": c.start_page,
                 "end_page": c.end_page,
-                "file_path": str(c.file_path) if c.file_path else None,
+                "file_path": str(c.file_path) if written(c) else None,
+                "file_name": c.file_path.name if c.file_path else None,
+                "sha256": hashes.get(c.file_path.name) if c.file_path else None,
             }
             for c in chapters
         ],
+        "text_format": text_format,
+        "text_files": [
+            {
+                "title": c.title,
+                "start_page": c.start_page,
+                "end_page": c.end_page,
+                "file_path": str(c.file_path),
+                "file_name": c.file_path.name,
+                "sha256": hashes.get(c.file_path.name),
+            }
+            for c in text_files or []
+        ],
+    }
+    with atomic_output(output_dir / "metadata.json") as partial:
+        partial.write_text(json.dumps(metadata, indent=2))
+
+
+def _source_fingerprint(session: DocumentSession, fast_fingerprint: bool) -> str:
+    # Fast and full fingerprints never compare equal, so switching modes
+    # rewrites every chapter once.
+    kind = "fast" if fast_fingerprint else "sha256"
+    return f"{kind}:{session.fingerprint(fast_fingerprint)}"
+
+
+def _stream_outputs(
+    session: DocumentSession,
+    output_dir: Path,
+    writer: PageRangeWriter,
+    chapters: List[Chapter],
+    outputs: OutputPlan,
+    source_fingerprint: str,
+    jobs: int,
+    profiler: Profiler,
+    index_only: bool,
+    text_format: Optional[str],
+    text_files: List[Chapter],
+    text_outputs: OutputPlan,
+) -> Iterator[Chapter]:
+    # Chapter files that are already current come first, then the rest in
+    # the order they finish. metadata.json is only written once every
+    # chapter is, so a split that stops early is redone next time.
+    hashes = {**outputs.unchanged, **text_outputs.unchanged}
+
+    # Text exports to write, by the name of their chapter PDF. Each is
+    # written in this process from the session's page text once its PDF is
+    # done, while worker processes go on writing other chapters.
+    writing = {c.file_path.name for c in text_outputs.write}
+    pending = {
+        c.file_path.name: text_file
+        for c, text_file in zip([c for c in chapters if c.file_path], text_files)
+        if text_file.file_path.name in writing
     }
-    (output_dir / "metadata.json").write_text(json.dumps(metadata, indent=2))
 
-    pretext = chapters[0] if chapters and chapters[0].title == "Pre-text" else None
-    posttext = chapters[-1] if chapters and chapters[-1].title == "Post-text" else None
+    def export_text(name: str):
+        text_file = pending.pop(name, None)
+        if text_file is not None:
+            write_chapter_text(
+                session.pages,
+                text_file,
+                text_file.file_path,
+                markdown=text_format == "markdown",
+            )
+            hashes[text_file.file_path.name] = file_sha256(text_file.file_path)
+
+    for chapter in chapters:
+        if chapter.file_path and chapter.file_path.name in outputs.unchanged:
+            export_text(chapter.file_path.name)
+            yield chapter
+
+    if not index_only:
+        with profiler.stage("write") as stage:
+            for chapter in iter_write_chapters(session, writer, outputs.write, jobs):
+                hashes[chapter.file_path.name] = file_sha256(chapter.file_path)
+                export_text(chapter.file_path.name)
+                yield chapter
+            stage.pages = sum(c.end_page - c.start_page + 1 for c in outputs.write)
+
+    if pending:
+        # Index-only: the text files stand in for the chapter PDFs.
+        with profiler.stage("text") as stage:
+            stage.pages = sum(c.end_page - c.start_page + 1 for c in pending.values())
+            for name, text_file in list(pending.items()):
+                export_text(name)
+                yield text_file
+
+    with profiler.stage("metadata"):
+        write_metadata(
+            output_dir,
+            session.path,
+            session.page_count,
+            chapters,
+            index_only,
+            source_fingerprint,
+            hashes,
+            text_format,
+            text_files,
+        )
 
-    logger.info(f"Successfully split into {len(chapters)} sections")
 
-    return SplitResult(
-        original=pdf_path, chapters=chapters, pretext=pretext, posttext=posttext
-    )
+def iter_split_pdf(
+    pdf_path: Union[Path, DocumentSession],
+    output_dir: Path,
+    writer: Union[str, PageRangeWriter] = "fitz",
+    jobs: int = 1,
+    cache: Optional[Cache] = None,
+    fast_fingerprint: bool = False,
+    profiler: Optional[Profiler] = None,
+    window: Optional[int] = None,
+    index_only: bool = False,
+    text_format: Optional[str] = None,
+) -> SplitStream:
+    """
+    Detect the chapters of a PDF and return a SplitStream whose plan is
+    ready at once and whose iteration writes chapter files one by one.
+    With text_format ("text" or "markdown"), each chapter's text is written
+    next to its PDF, or on its own in index-only mode, where iteration
+    yields the text files instead.
+    """
+    if text_format is not None and text_format not in TEXT_FORMATS:
+        raise ValueError(
+            f"Unknown text format {text_format!r}; "
+            f"choose from {', '.join(TEXT_FORMATS)}"
+        )
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    writer = get_writer(writer)
+    profiler = profiler or NULL_PROFILER
+
+    with ExitStack() as stack:
+        session = stack.enter_context(open_session(pdf_path, window))
+        logger.info(f"Processing: {session.path}")
+        session.profiler = profiler
+
+        with profiler.stage("detect", session.pages):
+            chapters = detect_plan(session, output_dir, cache, fast_fingerprint)
+
+        if session.window:
+            session.release()
+
+        source_fingerprint = _source_fingerprint(session, fast_fingerprint)
+        outputs = plan_outputs(
+            output_dir, chapters, source_fingerprint, index_only, source=session.path
+        )
+        text_files = (
+            [
+                replace(c, file_path=c.file_path.with_suffix(TEXT_FORMATS[text_format]))
+                for c in chapters
+                if c.file_path
+            ]
+            if text_format
+            else []
+        )
+        text_outputs = plan_outputs(
+            output_dir,
+            text_files,
+            source_fingerprint,
+            section="text_files",
+            source=session.path,
+        )
+        removed = remove_stale(outputs) + remove_stale(text_outputs)
+        logger.info(
+            f"{len(outputs.unchanged)} chapter files unchanged, "
+            f"{len(outputs.write)} to write, {removed} stale removed"
+        )
+        if text_format:
+            logger.info(
+                f"{len(text_outputs.unchanged)} text files unchanged, "
+                f"{len(text_outputs.write)} to write"
+            )
+
+        plan = chapters
+        if index_only:
+            plan = [
+                (
+                    c
+                    if c.file_path and c.file_path.name in outputs.unchanged
+                    else replace(c, file_path=None)
+                )
+                for c in chapters
+            ]
+
+        written = _stream_outputs(
+            session,
+            output_dir,
+            writer,
+            chapters,
+            outputs,
+            source_fingerprint,
+            jobs,
+            profiler,
+            index_only,
+            text_format,
+            text_files,
+            text_outputs,
+        )
+        return SplitStream(session.path, plan, written, stack.pop_all().close)
+
+
+def split_pdf(
+    pdf_path: Union[Path, DocumentSession],
+    output_dir: Path,
+    writer: Union[str, PageRangeWriter] = "fitz",
+    jobs: int = 1,
+    cache: Optional[Cache] = None,
+    fast_fingerprint: bool = False,
+    profiler: Optional[Profiler] = None,
+    window: Optional[int] = None,
+    index_only: bool = False,
+    text_format: Optional[str] = None,
+) -> SplitResult:
+    with iter_split_pdf(
+        pdf_path,
+        output_dir,
+        writer=writer,
+        jobs=jobs,
+        cache=cache,
+        fast_fingerprint=fast_fingerprint,
+        profiler=profiler,
+        window=window,
+        index_only=index_only,
+        text_format=text_format,
+    ) as stream:
+        result = stream.result()
+
+    if index_only:
+        logger.info(f"Indexed {len(result.chapters)} sections without writing them")
+    else:
+        logger.info(f"Successfully split into {len(result.chapters)} sections")
+    return result
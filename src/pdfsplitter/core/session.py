@@ -0,0 +1,89 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+import fitz
+from .page_index import PageTextIndex
+from ..utils.fingerprint import fast_fingerprint, file_sha256
+from ..utils.profiling import NULL_PROFILER
+
+
+class DocumentSession:
+    """
+    One parsed handle for a PDF, shared by detection and writing.
+    Owns the fitz document and its page text index.
+
+    With a window, the document is reopened every `window` pages read, so
+    parsed pages and full page text never pile up on very large files.
+    sha256 is the file's hash when the caller already has it.
+    """
+
+    def __init__(
+        self, pdf_path: Path, window: Optional[int] = None, sha256: Optional[str] = None
+    ):
+        self.path = Path(pdf_path)
+        self.window = window or None
+        self.doc = fitz.open(self.path)
+        self.pages = PageTextIndex(self.doc, window=self.window, on_window=self.release)
+        self._reader = None
+        self._copied = 0
+        self._fingerprints: dict[bool, str] = {False: sha256} if sha256 else {}
+        self.profiler = NULL_PROFILER
+
+    @property
+    def page_count(self) -> int:
+        return len(self.doc)
+
+    def fingerprint(self, fast: bool = False) -> str:
+        if fast not in self._fingerprints:
+            self._fingerprints[fast] = (
+                fast_fingerprint(self.path) if fast else file_sha256(self.path)
+            )
+        return self._fingerprints[fast]
+
+    @property
+    def reader(self):
+        # Only the PyPDF2 writer backend needs a second parse of the file.
+        if self._reader is None:
+            from PyPDF2 import PdfReader
+
+            self._reader = PdfReader(self.path)
+        return self._reader
+
+    def release(self):
+        # MuPDF keeps every parsed page object until the document is closed.
+        self.close()
+        self.doc = fitz.open(self.path)
+        self._reader = None
+        self._copied = 0
+        self.pages.release(self.doc)
+
+    def advance(self, pages: int):
+        """Count pages copied out; windowed sessions reopen after each window."""
+        if not self.window:
+            return
+        self._copied += pages
+        if self._copied >= self.window:
+            self.release()
+
+    def close(self):
+        if not self.doc.is_closed:
+            self.doc.close()
+
+    def __enter__(self) -> "DocumentSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+@contextmanager
+def open_session(
+    source: Union[Path, str, DocumentSession],
+    window: Optional[int] = None,
+) -> Iterator[DocumentSession]:
+    if isinstance(source, DocumentSession):
+        yield source
+        return
+
+    with DocumentSession(source, window) as session:
+        yield session
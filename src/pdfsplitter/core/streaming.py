@@ -0,0 +1,76 @@
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+from .models import Chapter, SplitResult
+
+
+class SplitStream:
+    """
+    A split whose plan is known but whose files are written lazily.
+    Iterating yields each chapter once its file is complete; result()
+    finishes the split and returns the SplitResult. Closing the stream
+    early stops writing and leaves metadata.json untouched.
+    """
+
+    def __init__(
+        self,
+        original: Path,
+        plan: list[Chapter],
+        chapters: Iterator[Chapter],
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        self.original = original
+        self.plan = plan
+        self.written: list[Chapter] = []
+        self._chapters = chapters
+        self._on_close = on_close
+
+    def __iter__(self) -> Iterator[Chapter]:
+        try:
+            for chapter in self._chapters:
+                self.written.append(chapter)
+                yield chapter
+        finally:
+            self.close()
+
+    def result(self) -> SplitResult:
+        for _ in self:
+            pass
+
+        chapters = self.plan
+        pretext = chapters[0] if chapters and chapters[0].title == "Pre-text" else None
+        posttext = (
+            chapters[-1] if chapters and chapters[-1].title == "Post-text" else None
+        )
+        return SplitResult(
+            original=self.original,
+            chapters=chapters,
+            pretext=pretext,
+            posttext=posttext,
+        )
+
+    def close(self):
+        close = getattr(self._chapters, "close", None)
+        if close is not None:
+            close()
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
+
+    def __enter__(self) -> "SplitStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_split(path: Path, output_dir: Path, **options) -> SplitStream:
+    """Start splitting a PDF or EPUB; see iter_split_pdf and iter_split_epub."""
+    path = Path(path)
+    if path.suffix.lower() == ".epub":
+        from .epub_processor import iter_split_epub
+
+        return iter_split_epub(path, output_dir, **options)
+
+    from .pdf_processor import iter_split_pdf
+
+    return iter_split_pdf(path, output_dir, **options)
@@ -0,0 +1,134 @@
+from pathlib import Path
+from typing import BinaryIO, Iterator, Union
+import fitz
+from .incremental import atomic_output
+from .models import Chapter
+from .session import DocumentSession
+from ..utils.parallel import iter_largest_first
+
+
+class PageRangeWriter:
+    name = ""
+
+    def write(
+        self,
+        session: DocumentSession,
+        start_page: int,
+        end_page: int,
+        output_path: Union[Path, BinaryIO],
+    ):
+        raise NotImplementedError
+
+
+class FitzWriter(PageRangeWriter):
+    """
+    Copies a page range with a single insert_pdf call.
+    garbage and deflate are passed straight to fitz Document.save.
+    """
+
+    name = "fitz"
+
+    def __init__(self, garbage: int = 1, deflate: bool = True):
+        self.garbage = garbage
+        self.deflate = deflate
+
+    def write(
+        self,
+        session: DocumentSession,
+        start_page: int,
+        end_page: int,
+        output_path: Union[Path, BinaryIO],
+    ):
+        with fitz.open() as out:
+            out.insert_pdf(session.doc, from_page=start_page, to_page=end_page)
+            out.save(output_path, garbage=self.garbage, deflate=self.deflate)
+
+
+class PyPDF2Writer(PageRangeWriter):
+    name = "pypdf2"
+
+    def write(
+        self,
+        session: DocumentSession,
+        start_page: int,
+        end_page: int,
+        output_path: Union[Path, BinaryIO],
+    ):
+        from PyPDF2 import PdfWriter
+
+        reader = session.reader
+        writer = PdfWriter()
+        for p in range(start_page, end_page + 1):
+            writer.add_page(reader.pages[p])
+        writer.write(output_path)
+
+
+WRITERS = {
+    FitzWriter.name: FitzWriter,
+    PyPDF2Writer.name: PyPDF2Writer,
+}
+
+
+def get_writer(
+    writer: Union[str, PageRangeWriter] = "fitz", **options
+) -> PageRangeWriter:
+    if isinstance(writer, PageRangeWriter):
+        return writer
+
+    try:
+        return WRITERS[writer](**options)
+    except KeyError:
+        raise ValueError(
+            f"Unknown writer backend: {writer} (choose from {', '.join(WRITERS)})"
+        )
+
+
+def _write_chapter(
+    session: DocumentSession,
+    writer: PageRangeWriter,
+    start_page: int,
+    end_page: int,
+    output_path: Path,
+):
+    with atomic_output(Path(output_path)) as partial:
+        writer.write(session, start_page, end_page, partial)
+    session.advance(end_page - start_page + 1)
+
+
+def iter_write_chapters(
+    session: DocumentSession,
+    writer: PageRangeWriter,
+    chapters: list[Chapter],
+    jobs: int = 1,
+) -> Iterator[Chapter]:
+    """
+    Write chapter files, yielding each chapter as soon as its file is
+    complete. With jobs > 1 chapters come back in completion order.
+    """
+    if jobs <= 1 or len(chapters) < 2:
+        for chapter in chapters:
+            _write_chapter(
+                session, writer, chapter.start_page, chapter.end_page, chapter.file_path
+            )
+            yield chapter
+        return
+
+    yield from iter_largest_first(
+        chapters,
+        size=lambda c: c.end_page - c.start_page,
+        work=_write_chapter,
+        args=lambda c: (writer, c.start_page, c.end_page, c.file_path),
+        jobs=jobs,
+        open_resource=DocumentSession,
+        resource_args=(session.path, session.window),
+    )
+
+
+def write_chapters(
+    session: DocumentSession,
+    writer: PageRangeWriter,
+    chapters: list[Chapter],
+    jobs: int = 1,
+):
+    for _ in iter_write_chapters(session, writer, chapters, jobs):
+        pass
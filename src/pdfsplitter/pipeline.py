@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+from .core.models import SplitResult
+from .utils import Cache, get_logger
+from .utils.profiling import NULL_PROFILER, PROFILE_NAME, NullProfiler, Profiler
+
+if TYPE_CHECKING:
+    from .core.session import DocumentSession
+    from .core.writers import PageRangeWriter
+
+logger = get_logger(__name__)
+
+SUPPORTED_SUFFIXES = (".pdf", ".epub")
+
+
+@dataclass
+class ProcessOptions:
+    """
+    How process_file splits a file, one field per CLI option of that name.
+    """
+
+    writer: Union[str, "PageRangeWriter"] = "fitz"
+    jobs: int = 1
+    ocr_mode: str = "full"
+    ocr_jobs: Optional[int] = None
+    fast_fingerprint: bool = False
+    page_window: Optional[int] = None
+    index_only: bool = False
+    chapter_text: Optional[str] = None
+    epub_resources: str = "shared"
+    epub_format: str = "xhtml"
+
+
+def process_file(
+    input_file: Path,
+    output_dir: Path,
+    cache: Optional[Cache] = None,
+    profile: bool = False,
+    sha256: Optional[str] = None,
+    **options,
+) -> SplitResult:
+    """
+    Split one PDF or EPUB into output_dir; options are ProcessOptions
+    fields. sha256 is the input's hash when the caller already has it, so
+    it is not read again to hash it.
+    """
+    profiler = Profiler() if profile else None
+    result = _process_file(
+        input_file,
+        output_dir,
+        cache,
+        ProcessOptions(**options),
+        profiler or NULL_PROFILER,
+        sha256,
+    )
+
+    if profiler is not None:
+        report_path = Path(output_dir) / PROFILE_NAME
+        profiler.write(report_path, source=str(input_file))
+        logger.info(f"Profile written to {report_path}")
+
+    return result
+
+
+def _split_pdf(
+    source: Union[Path, "DocumentSession"],
+    output_dir: Path,
+    cache: Optional[Cache],
+    options: ProcessOptions,
+    profiler: Union[Profiler, NullProfiler],
+) -> SplitResult:
+    from .core.pdf_processor import split_pdf
+
+    return split_pdf(
+        source,
+        output_dir,
+        writer=options.writer,
+        jobs=options.jobs,
+        cache=cache,
+        fast_fingerprint=options.fast_fingerprint,
+        profiler=profiler,
+        window=options.page_window,
+        index_only=options.index_only,
+        text_format=options.chapter_text,
+    )
+
+
+def _process_file(
+    input_file: Path,
+    output_dir: Path,
+    cache: Optional[Cache],
+    options: ProcessOptions,
+    profiler: Union[Profiler, NullProfiler],
+    sha256: Optional[str],
+) -> SplitResult:
+    suffix = input_file.suffix.lower()
+
+    if suffix == ".pdf":
+        # PDF support pulls in fitz, so EPUB-only runs never load it.
+        from .core.ocr_detector import find_pages_without_text, needs_ocr
+        from .core.ocr_runner import ocr_document, run_ocr_on_pages
+        from .core.session import DocumentSession
+
+        if options.ocr_mode == "pages":
+            # Scanned plates can sit anywhere in an otherwise text book, past
+            # the pages needs_ocr samples, so every page is scanned instead.
+            with profiler.stage("ocr_page_scan") as stage:
+                pages = find_pages_without_text(input_file, window=options.page_window)
+                stage.pages = len(pages)
+            logger.info(f"OCR decision: {len(pages)} pages without a text layer")
+            needs = bool(pages)
+        else:
+            with profiler.stage("ocr_check"):
+                needs, reasoning = needs_ocr(
+                    input_file, cache, options.fast_fingerprint, sha256
+                )
+            logger.info(f"OCR decision: {reasoning}")
+
+        if needs:
+            logger.info("Scanned PDF detected, running OCR...")
+            # Inside output_dir, never next to the input: that directory may be
+            # read-only, and a file of the same name there is the user's.
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            ocr_path = output_dir / f"{input_file.stem}_ocr.pdf"
+            with profiler.stage("ocr"):
+                if options.ocr_mode == "pages":
+                    ocr_ok = run_ocr_on_pages(
+                        input_file, ocr_path, pages, jobs=options.ocr_jobs
+                    )
+                else:
+                    ocr_ok = ocr_document(input_file, ocr_path, jobs=options.ocr_jobs)
+
+            if ocr_ok:
+                result = _split_pdf(ocr_path, output_dir, cache, options, profiler)
+                if options.index_only:
+                    # The index points at the OCRed pages, so they must stay.
+                    logger.info(f"Keeping OCR output {ocr_path} as the indexed source")
+                    return result
+                try:
+                    ocr_path.unlink()
+                except OSError:
+                    pass
+                return result
+
+            logger.warning("OCR failed, proceeding with original file")
+
+        with DocumentSession(input_file, options.page_window, sha256) as session:
+            return _split_pdf(session, output_dir, cache, options, profiler)
+
+    if suffix == ".epub":
+        from .core.epub_processor import split_epub
+
+        with profiler.stage("split_epub"):
+            return split_epub(
+                input_file,
+                output_dir,
+                resources=options.epub_resources,
+                output_format=options.epub_format,
+                jobs=options.jobs,
+            )
+
+    raise ValueError(f"Unsupported file type: {input_file.suffix}")
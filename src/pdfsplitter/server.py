@@ -0,0 +1,517 @@
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+import click
+from .batch import _init_worker, _process_one, batch_output_dir
+from .config import settings
+from .constants import (
+    CACHE_BACKENDS,
+    EPUB_FORMATS,
+    EPUB_RESOURCE_MODES,
+    EXTRA_HEADING_RULES,
+    OCR_MODES,
+    PDF_WRITERS,
+    TEXT_FORMATS,
+)
+from .pipeline import SUPPORTED_SUFFIXES
+from .utils import get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+# Finished jobs kept for status queries; older ones are forgotten first.
+JOB_HISTORY = 1000
+
+# Per-job options a client may set, with the type each must have.
+JOB_OPTIONS = {
+    "writer": str,
+    "jobs": int,
+    "ocr_mode": str,
+    "ocr_jobs": int,
+    "fast_fingerprint": bool,
+    "page_window": int,
+    "index_only": bool,
+    "chapter_text": str,
+    "epub_resources": str,
+    "epub_format": str,
+    "profile": bool,
+}
+
+
+class QueueFull(Exception):
+    pass
+
+
+class WorkersUnavailable(Exception):
+    pass
+
+
+class JobError(ValueError):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    input: Path
+    output_dir: Path
+    options: dict
+    submitted_at: str
+    future: Optional[Future] = None
+    record: dict = field(default_factory=dict)
+
+    @property
+    def status(self) -> str:
+        if self.record:
+            return self.record["status"]
+        if self.future is not None and self.future.running():
+            return "running"
+        return "queued"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "input": str(self.input),
+            "output_dir": str(self.output_dir),
+            "options": self.options,
+            "submitted_at": self.submitted_at,
+            **{k: v for k, v in self.record.items() if k not in ("input", "status")},
+        }
+
+
+def _warm_worker(
+    cache_backend: Optional[str], log_level: str, heading_rules: tuple[str, ...]
+):
+    _init_worker(cache_backend, log_level, heading_rules)
+
+    # Pay for the heavy imports once per worker instead of once per job.
+    import fitz  # noqa: F401
+    import openai  # noqa: F401
+    import PyPDF2  # noqa: F401
+    from .core import epub_processor, ocr_detector, pdf_processor  # noqa: F401
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class SplitService:
+    """
+    Accepts split jobs into a bounded queue and runs them on a pool of warm
+    worker processes. At most queue_size jobs may be unfinished at once;
+    submit raises QueueFull beyond that, and WorkersUnavailable when a
+    worker process has died; the pool is then replaced for later jobs.
+    Client options are applied over defaults, which may hold objects such
+    as a configured writer.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 64,
+        cache_backend: Optional[str] = "json",
+        log_level: str = "INFO",
+        heading_rules: tuple[str, ...] = (),
+        output_root: Optional[Path] = None,
+        defaults: Optional[dict] = None,
+    ):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.output_root = output_root
+        self.defaults = defaults or {}
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self.lock = threading.Lock()
+        self._worker_args = (cache_backend, log_level, heading_rules)
+        self.pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_warm_worker,
+            initargs=self._worker_args,
+        )
+
+    def warm_up(self):
+        # Start every worker now so the first jobs do not pay for imports.
+        for future in [self.pool.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+
+    def _pending(self) -> int:
+        return sum(1 for job in self.jobs.values() if not job.record)
+
+    def _options(self, request: dict) -> dict:
+        options = {}
+        for name, value in request.items():
+            if name in ("input", "output_dir"):
+                continue
+            expected = JOB_OPTIONS.get(name)
+            if expected is None:
+                raise JobError(f"Unknown option: {name}")
+            if type(value) is not expected:
+                raise JobError(f"{name} must be {expected.__name__}")
+            options[name] = value
+
+        if options.get("writer", PDF_WRITERS[0]) not in PDF_WRITERS:
+            raise JobError(f"writer must be one of {', '.join(PDF_WRITERS)}")
+        if options.get("ocr_mode", OCR_MODES[0]) not in OCR_MODES:
+            raise JobError(f"ocr_mode must be one of {', '.join(OCR_MODES)}")
+        if (
+            options.get("epub_resources", EPUB_RESOURCE_MODES[0])
+            not in EPUB_RESOURCE_MODES
+        ):
+            raise JobError(
+                f"epub_resources must be one of {', '.join(EPUB_RESOURCE_MODES)}"
+            )
+        if options.get("chapter_text") not in (None, *TEXT_FORMATS):
+            raise JobError(f"chapter_text must be one of {', '.join(TEXT_FORMATS)}")
+        if options.get("epub_format", EPUB_FORMATS[0]) not in EPUB_FORMATS:
+            raise JobError(f"epub_format must be one of {', '.join(EPUB_FORMATS)}")
+        return options
+
+    def submit(self, request: dict) -> Job:
+        if not isinstance(request.get("input"), str):
+            raise JobError("input must be a path string")
+        input_file = Path(request["input"]).expanduser().resolve()
+        if not input_file.is_file():
+            raise JobError(f"Input file not found: {input_file}")
+        if input_file.suffix.lower() not in SUPPORTED_SUFFIXES:
+            raise JobError(f"Unsupported file type: {input_file.suffix}")
+
+        options = self._options(request)
+        output_dir = (
+            Path(request["output_dir"]).expanduser().resolve()
+            if request.get("output_dir")
+            else batch_output_dir(input_file, self.output_root)
+        )
+
+        with self.lock:
+            if self._pending() >= self.queue_size:
+                raise QueueFull(f"Queue is full ({self.queue_size} jobs waiting)")
+            busy = next(
+                (
+                    job
+                    for job in self.jobs.values()
+                    if not job.record and job.output_dir == output_dir
+                ),
+                None,
+            )
+            if busy is not None:
+                raise JobError(
+                    f"{output_dir} is already being written by job {busy.id}"
+                )
+
+            # Submitted before it is registered, so a job the pool refuses
+            # never lingers as queued, holding its output directory.
+            try:
+                future = self.pool.submit(
+                    _process_one, input_file, output_dir, {**self.defaults, **options}
+                )
+            except BrokenProcessPool:
+                logger.error("A worker process died; starting a new pool")
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._new_pool()
+                raise WorkersUnavailable("Worker pool restarted, retry the job")
+
+            job = Job(
+                id=uuid.uuid4().hex,
+                input=input_file,
+                output_dir=output_dir,
+                options=options,
+                submitted_at=datetime.now(timezone.utc).isoformat(),
+                future=future,
+            )
+            self.jobs[job.id] = job
+            self._forget_finished()
+
+        # Outside the lock: a future that is already done runs this at once.
+        future.add_done_callback(lambda future: self._finish(job, future))
+        logger.info(f"Queued job {job.id}: {input_file}")
+        return job
+
+    def _finish(self, job: Job, future: Future):
+        try:
+            record = future.result()
+        except Exception as e:
+            # The worker process itself died; _process_one catches the rest.
+            record = {"status": "failed", "chapters": 0, "error": str(e)}
+        with self.lock:
+            job.record = record
+        logger.info(f"Job {job.id} {record['status']}")
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.record]
+        for job_id in finished[: max(0, len(finished) - JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def health(self) -> dict:
+        with self.lock:
+            statuses = [job.status for job in self.jobs.values()]
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "done": statuses.count("done"),
+            "failed": statuses.count("failed"),
+        }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class SplitRequestHandler(BaseHTTPRequestHandler):
+    # POST /jobs, GET /jobs, GET /jobs/<id>, GET /jobs/<id>/metadata, GET /health
+    server_version = "pdfsplitter"
+    service: SplitService
+
+    def _send_json(self, status: HTTPStatus, payload):
+        body = json.dumps(payload, indent=2).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: HTTPStatus, message: str):
+        self._send_json(status, {"error": message})
+
+    def do_GET(self):
+        parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+
+        if parts == ["health"]:
+            return self._send_json(HTTPStatus.OK, self.service.health())
+        if parts == ["jobs"]:
+            with self.service.lock:
+                jobs = [job.to_dict() for job in self.service.jobs.values()]
+            return self._send_json(HTTPStatus.OK, jobs)
+        if len(parts) not in (2, 3) or parts[0] != "jobs":
+            return self._error(HTTPStatus.NOT_FOUND, f"No route for {self.path}")
+
+        job = self.service.get(parts[1])
+        if job is None:
+            return self._error(HTTPStatus.NOT_FOUND, f"Unknown job: {parts[1]}")
+        if len(parts) == 2:
+            return self._send_json(HTTPStatus.OK, job.to_dict())
+        if parts[2] != "metadata":
+            return self._error(HTTPStatus.NOT_FOUND, f"No route for {self.path}")
+
+        if job.status != "done":
+            return self._error(HTTPStatus.CONFLICT, f"Job is {job.status}")
+        try:
+            metadata = json.loads((job.output_dir / "metadata.json").read_text())
+        except (OSError, ValueError) as e:
+            return self._error(HTTPStatus.NOT_FOUND, f"No metadata.json: {e}")
+        self._send_json(HTTPStatus.OK, metadata)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._error(HTTPStatus.NOT_FOUND, f"No route for {self.path}")
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise JobError("Request body must be a JSON object")
+            job = self.service.submit(request)
+        except QueueFull as e:
+            return self._error(HTTPStatus.TOO_MANY_REQUESTS, str(e))
+        except WorkersUnavailable as e:
+            return self._error(HTTPStatus.SERVICE_UNAVAILABLE, str(e))
+        except (JobError, ValueError) as e:
+            return self._error(HTTPStatus.BAD_REQUEST, str(e))
+
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    def address_string(self) -> str:
+        # Unix socket clients have no (host, port) address.
+        if isinstance(self.client_address, tuple):
+            return self.client_address[0]
+        return "unix"
+
+    def log_message(self, format: str, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class UnixHTTPServer(ThreadingHTTPServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # HTTPServer.server_bind expects a (host, port) address.
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = str(self.server_address)
+        self.server_port = 0
+
+
+def make_server(
+    service: SplitService,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[Path] = None,
+) -> ThreadingHTTPServer:
+    handler = type("Handler", (SplitRequestHandler,), {"service": service})
+    if socket_path is None:
+        return ThreadingHTTPServer((host, port), handler)
+
+    if socket_path.exists():
+        socket_path.unlink()
+    return UnixHTTPServer(str(socket_path), handler)
+
+
+@click.command()
+@click.option("--host", default=None, help="Bind address (default: SERVER_HOST)")
+@click.option(
+    "--port", type=int, default=None, help="TCP port (default: SERVER_PORT setting)"
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Listen on this Unix socket instead of TCP",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Worker processes running jobs (default: SERVER_WORKERS setting)",
+)
+@click.option(
+    "--queue-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Unfinished jobs allowed before new ones are refused with 429 "
+    "(default: SERVER_QUEUE_SIZE setting)",
+)
+@click.option(
+    "--output-root",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory for <stem>_output folders of jobs without output_dir "
+    "(default: next to each input)",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Cache OCR decisions and detected chapter plans",
+)
+@click.option(
+    "--cache-backend",
+    type=click.Choice(CACHE_BACKENDS),
+    default=None,
+    help="Cache storage shared by the workers (default: CACHE_BACKEND setting)",
+)
+@click.option(
+    "--writer",
+    type=click.Choice(PDF_WRITERS),
+    default=None,
+    help="Default chapter writer for jobs (default: PDF_WRITER setting)",
+)
+@click.option(
+    "--extra-headings",
+    type=click.Choice(EXTRA_HEADING_RULES),
+    multiple=True,
+    help="Extra heading rule sets loaded in every worker "
+    "(default: EXTRA_HEADING_RULES setting)",
+)
+@click.option("--verbose", "-v", is_flag=True, help="Enable verbose output")
+def main(
+    host: str,
+    port: int,
+    socket_path: Path,
+    workers: int,
+    queue_size: int,
+    output_root: Path,
+    cache: bool,
+    cache_backend: str,
+    writer: str,
+    extra_headings: tuple[str, ...],
+    verbose: bool,
+):
+    log_level = "DEBUG" if verbose else "INFO"
+    setup_logging(log_level)
+
+    from .core.writers import FitzWriter, get_writer
+
+    def setting(value, name: str):
+        return getattr(settings, name) if value is None else value
+
+    writer = setting(writer, "PDF_WRITER")
+    defaults = {
+        "writer": (
+            FitzWriter(garbage=settings.PDF_GARBAGE, deflate=settings.PDF_DEFLATE)
+            if writer == "fitz"
+            else get_writer(writer)
+        ),
+        "ocr_mode": settings.OCR_MODE,
+        "ocr_jobs": settings.OCR_JOBS,
+        "fast_fingerprint": settings.FAST_FINGERPRINT,
+        "page_window": settings.PAGE_WINDOW or None,
+        "chapter_text": settings.CHAPTER_TEXT or None,
+        "epub_resources": settings.EPUB_RESOURCES,
+        "epub_format": settings.EPUB_FORMAT,
+    }
+
+    service = SplitService(
+        workers=setting(workers, "SERVER_WORKERS"),
+        queue_size=setting(queue_size, "SERVER_QUEUE_SIZE"),
+        cache_backend=setting(cache_backend, "CACHE_BACKEND") if cache else None,
+        log_level=log_level,
+        heading_rules=tuple(extra_headings or settings.EXTRA_HEADING_RULES),
+        output_root=output_root,
+        defaults=defaults,
+    )
+
+    start = time.perf_counter()
+    service.warm_up()
+    logger.info(
+        f"Started {service.workers} warm workers in "
+        f"{time.perf_counter() - start:.1f}s"
+    )
+
+    server = make_server(
+        service,
+        setting(host, "SERVER_HOST"),
+        setting(port, "SERVER_PORT"),
+        socket_path,
+    )
+    logger.info(f"Listening on {socket_path or server.server_address}")
+
+    # shutdown() waits for serve_forever to return, so it cannot run on the
+    # thread that is serving.
+    signal.signal(
+        signal.SIGTERM,
+        lambda signum, frame: threading.Thread(target=server.shutdown).start(),
+    )
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if socket_path is not None and socket_path.exists():
+            socket_path.unlink()
+
+
+if __name__ == "__main__":
+    main()
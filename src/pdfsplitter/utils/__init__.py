@@ -1,14 +1,24 @@
-from .llm import analyze_for_ocr
-from .cache import Cache
-from .logging import setup_logging, get_logger
-from .file_ops import detect_file_type, ensure_directory, sanitize_filename
-
-__all__ = [
-    "analyze_for_ocr",
-    "Cache",
-    "setup_logging",
-    "get_logger",
-    "detect_file_type",
-    "ensure_directory",
-    "sanitize_filename",
-]
+from importlib import import_module
+
+# The LLM helper imports openai, so everything here loads on first access.
+_EXPORTS = {
+    "analyze_for_ocr": ".llm",
+    "Cache": ".cache",
+    "SQLiteCache": ".cache",
+    "open_cache": ".cache",
+    "setup_logging": ".logging",
+    "get_logger": ".logging",
+    "detect_file_type": ".file_ops",
+    "ensure_directory": ".file_ops",
+    "sanitize_filename": ".file_ops",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -1,6 +1,9 @@
 import json
+import os
+import sqlite3
+import tempfile
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 import hashlib
 import time
 
@@ -9,6 +12,8 @@ class Cache:
     def __init__(self, cache_dir: Path, ttl_seconds: int = 86400):
         self.cache_dir = cache_dir
         self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
         cache_dir.mkdir(parents=True, exist_ok=True)
 
     def _get_cache_path(self, key: str) -> Path:
@@ -16,6 +21,14 @@ class Cache:
         return self.cache_dir / f"{hashed}.json"
 
     def get(self, key: str) -> Optional[dict]:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _get(self, key: str) -> Optional[dict]:
         cache_path = self._get_cache_path(key)
         if not cache_path.exists():
             return None
@@ -33,7 +46,11 @@ class Cache:
         cache_path = self._get_cache_path(key)
         data = {"timestamp": time.time(), "value": value}
         try:
-            cache_path.write_text(json.dumps(data))
+            # Write then rename so concurrent readers never see a partial file.
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps(data))
+            os.replace(tmp_path, cache_path)
         except OSError:
             pass
 
@@ -43,3 +60,137 @@ class Cache:
                 cache_file.unlink()
             except OSError:
                 pass
+
+    def stats(self) -> dict:
+        return {"backend": "json", "hits": self.hits, "misses": self.misses}
+
+
+class SQLiteCache:
+    """
+    Single-file cache in WAL mode, safe to share between processes.
+    Entries past max_bytes are evicted least recently used first.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: int = 86400,
+        max_bytes: int = 64 * 1024 * 1024,
+        filename: str = "cache.sqlite3",
+    ):
+        self.cache_dir = cache_dir
+        self.db_path = cache_dir / filename
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each process opens its own.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)"
+            )
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        try:
+            row = self.conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            if now - row[1] > self.ttl_seconds:
+                self.conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+
+            self.conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return json.loads(row[0])
+        except (sqlite3.Error, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: dict):
+        payload = json.dumps(value)
+        now = time.time()
+        try:
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now, now),
+                )
+                self._evict()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self):
+        total = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed ASC"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self.conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def clear(self):
+        try:
+            self.conn.execute("DELETE FROM entries")
+        except sqlite3.Error:
+            pass
+
+    def stats(self) -> dict:
+        entries, size = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return {
+            "backend": "sqlite",
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+def open_cache(
+    backend: str, cache_dir: Path, max_bytes: Optional[int] = None
+) -> Union[Cache, SQLiteCache]:
+    if backend == "sqlite":
+        if max_bytes is None:
+            return SQLiteCache(cache_dir)
+        return SQLiteCache(cache_dir, max_bytes=max_bytes)
+    if backend == "json":
+        return Cache(cache_dir)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,38 @@
+import hashlib
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 20
+SAMPLE_SIZE = 1 << 20
+
+
+def file_sha256(path: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+
+    return digest.hexdigest()
+
+
+def fast_fingerprint(path: Path, sample_size: int = SAMPLE_SIZE) -> str:
+    """
+    Hash of size, mtime and the first and last sample_size bytes.
+    Files too small to sample are hashed in full.
+    """
+    stat = path.stat()
+    if stat.st_size <= 2 * sample_size:
+        return file_sha256(path)
+
+    digest = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(sample_size))
+        f.seek(-sample_size, 2)
+        digest.update(f.read(sample_size))
+
+    return digest.hexdigest()
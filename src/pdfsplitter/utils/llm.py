@@ -1,23 +1,8 @@
+import asyncio
 from typing import Optional
-from openai import OpenAI, RateLimitError, APIError
 from ..config import settings
 
-client = OpenAI(
-    base_url="https://openrouter.ai/api/v1",
-    api_key=settings.OPENROUTER_API_KEY,
-    default_headers={
-        "HTTP-Referer": "https://pdfsplitter.local",
-        "X-Title": "PDFSplitter",
-    },
-)
-
-
-def analyze_for_ocr(text_samples: list[str]) -> tuple[Optional[bool], str]:
-    """
-    Query LLM to determine if OCR is needed.
-    Returns tuple of (result, reasoning) where result is None on failure.
-    """
-    prompt = """Analyze the following document samples and determine if OCR processing is needed.
+OCR_PROMPT = """Analyze the following document samples and determine if OCR processing is needed.
 
 Look for these indicators:
 1. Text is garbled, nonsensical, or contains mojibake (encoding errors)
@@ -33,32 +18,122 @@ Document samples:
 Respond with EXACTLY ONE WORD: "YES" if OCR is needed, "NO" if not needed.
 If the document appears to be a table of contents or blank pages, respond "NO"."""
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.MODEL_NAME,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt.format(content="\n\n---\n\n".join(text_samples)),
-                }
-            ],
-            temperature=0.1,
-            max_tokens=10,
+DEFAULT_HEADERS = {
+    "HTTP-Referer": "https://pdfsplitter.local",
+    "X-Title": "PDFSplitter",
+}
+
+_client = None
+
+
+def get_client():
+    # openai is slow to import and only needed once a document is classified.
+    global _client
+    if _client is None:
+        from openai import OpenAI
+
+        _client = OpenAI(
+            base_url=settings.LLM_BASE_URL,
+            api_key=settings.OPENROUTER_API_KEY,
+            default_headers=DEFAULT_HEADERS,
         )
-        content = response.choices[0].message.content
-        if not content:
-            return None, "Empty response from LLM"
-
-        result = content.strip().upper()
-        if "YES" in result:
-            return True, "LLM determined OCR is needed"
-        elif "NO" in result:
-            return False, "LLM determined document is already searchable"
-        else:
-            return None, f"Unexpected LLM response: {content}"
-    except RateLimitError as e:
+    return _client
+
+
+def _request(text_samples: list[str]) -> dict:
+    return {
+        "model": settings.MODEL_NAME,
+        "messages": [
+            {
+                "role": "user",
+                "content": OCR_PROMPT.format(content="\n\n---\n\n".join(text_samples)),
+            }
+        ],
+        "temperature": 0.1,
+        "max_tokens": 10,
+    }
+
+
+def _parse_response(response) -> tuple[Optional[bool], str]:
+    content = response.choices[0].message.content
+    if not content:
+        return None, "Empty response from LLM"
+
+    result = content.strip().upper()
+    if "YES" in result:
+        return True, "LLM determined OCR is needed"
+    elif "NO" in result:
+        return False, "LLM determined document is already searchable"
+    else:
+        return None, f"Unexpected LLM response: {content}"
+
+
+def _error_result(e: Exception) -> tuple[None, str]:
+    from openai import RateLimitError, APIError
+
+    if isinstance(e, RateLimitError):
         return None, f"Rate limit error: {str(e)}"
-    except APIError as e:
+    if isinstance(e, APIError):
         return None, f"API error: {str(e)}"
+    return None, f"Unexpected error: {str(e)}"
+
+
+def analyze_for_ocr(text_samples: list[str]) -> tuple[Optional[bool], str]:
+    """
+    Query LLM to determine if OCR is needed.
+    Returns tuple of (result, reasoning) where result is None on failure.
+    """
+    try:
+        response = get_client().chat.completions.create(**_request(text_samples))
+        return _parse_response(response)
     except Exception as e:
-        return None, f"Unexpected error: {str(e)}"
+        return _error_result(e)
+
+
+async def analyze_many_for_ocr_async(
+    samples: list[list[str]],
+    concurrency: Optional[int] = None,
+    base_url: Optional[str] = None,
+) -> list[tuple[Optional[bool], str]]:
+    """
+    Classify many documents at once, one request per entry in samples.
+    At most `concurrency` requests are in flight, all sharing one client and
+    its connection pool. Results come back in input order.
+    """
+    from openai import AsyncOpenAI
+
+    concurrency = concurrency or settings.LLM_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+
+    try:
+        client = AsyncOpenAI(
+            base_url=base_url or settings.LLM_BASE_URL,
+            api_key=settings.OPENROUTER_API_KEY,
+            default_headers=DEFAULT_HEADERS,
+        )
+    except Exception as e:
+        return [_error_result(e)] * len(samples)
+
+    async with client:
+
+        async def classify(text_samples: list[str]):
+            async with semaphore:
+                try:
+                    response = await client.chat.completions.create(
+                        **_request(text_samples)
+                    )
+                    return _parse_response(response)
+                except Exception as e:
+                    return _error_result(e)
+
+        return await asyncio.gather(*(classify(s) for s in samples))
+
+
+def analyze_many_for_ocr(
+    samples: list[list[str]],
+    concurrency: Optional[int] = None,
+    base_url: Optional[str] = None,
+) -> list[tuple[Optional[bool], str]]:
+    if not samples:
+        return []
+    return asyncio.run(analyze_many_for_ocr_async(samples, concurrency, base_url))
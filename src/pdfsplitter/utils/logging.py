@@ -1,6 +1,5 @@
 import logging
 import sys
-from ..config import settings
 
 
 def setup_logging(level: str = "INFO"):
@@ -0,0 +1,50 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_worker_resource: Any = None
+
+
+def _open_worker_resource(open_resource: Callable[..., Any], args: tuple):
+    # Each worker opens its resource once and uses it for every item sent to it.
+    global _worker_resource
+    _worker_resource = open_resource(*args)
+
+
+def _work_in_worker(work: Callable[..., Any], args: tuple):
+    return work(_worker_resource, *args)
+
+
+def iter_largest_first(
+    items: list[T],
+    size: Callable[[T], int],
+    work: Callable[..., Any],
+    args: Callable[[T], tuple],
+    jobs: int,
+    open_resource: Callable[..., Any],
+    resource_args: tuple = (),
+) -> Iterator[T]:
+    """
+    Call work(resource, *args(item)) for every item in up to jobs worker
+    processes, each of which opens resource = open_resource(*resource_args)
+    once. Yields each item as soon as its call has finished.
+    """
+    # Largest items are handed out first so a long one does not finish last.
+    largest_first = sorted(items, key=size, reverse=True)
+    pool = ProcessPoolExecutor(
+        max_workers=min(jobs, len(items)),
+        initializer=_open_worker_resource,
+        initargs=(open_resource, resource_args),
+    )
+    try:
+        futures = {
+            pool.submit(_work_in_worker, work, args(item)): item
+            for item in largest_first
+        }
+        for future in as_completed(futures):
+            future.result()
+            yield futures[future]
+    finally:
+        # A consumer that stops early should not wait for items it won't read.
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,123 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PROFILE_NAME = "profile.json"
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux.
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+@dataclass
+class StageStats:
+    name: str
+    depth: int
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    pages: int = 0
+    peak_rss_mb: Optional[float] = None
+    rss_growth_mb: float = 0.0
+
+
+class StageRecord:
+    """Handle yielded by Profiler.stage; callers may set pages directly."""
+
+    def __init__(self, index=None):
+        self.index = index
+        self.pages = 0
+
+
+class Profiler:
+    """
+    Wall time, CPU time, pages touched and peak RSS per named stage.
+    Stages may nest; repeated stages with the same name are summed.
+    CPU time covers this process only, and peak RSS is the process
+    high-water mark when the stage ended.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, StageStats] = {}
+        self.depth = 0
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str, index=None) -> Iterator[StageRecord]:
+        # When given a PageTextIndex, every page it serves counts as touched.
+        record = StageRecord(index)
+        outer_touched = None
+        if index is not None:
+            outer_touched = index.touched
+            index.touched = set()
+
+        stats = self.stages.setdefault(name, StageStats(name, self.depth))
+        rss_before = peak_rss_mb()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        self.depth += 1
+        try:
+            yield record
+        finally:
+            self.depth -= 1
+            stats.calls += 1
+            stats.wall_seconds += time.perf_counter() - wall
+            stats.cpu_seconds += time.process_time() - cpu
+
+            if index is not None:
+                touched = index.touched
+                index.touched = outer_touched
+                if outer_touched is not None:
+                    outer_touched |= touched
+                record.pages = max(record.pages, len(touched))
+            stats.pages += record.pages
+
+            stats.peak_rss_mb = peak_rss_mb()
+            if rss_before is not None:
+                stats.rss_growth_mb += stats.peak_rss_mb - rss_before
+
+    def report(self, **extra) -> dict:
+        def rounded(stats: StageStats) -> dict:
+            data = asdict(stats)
+            for key, value in data.items():
+                if isinstance(value, float):
+                    data[key] = round(value, 4)
+            return data
+
+        return {
+            **extra,
+            "wall_seconds": round(time.perf_counter() - self.started, 4),
+            "cpu_seconds": round(time.process_time() - self.started_cpu, 4),
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": [rounded(s) for s in self.stages.values()],
+        }
+
+    def write(self, path: Path, **extra) -> dict:
+        report = self.report(**extra)
+        path.write_text(json.dumps(report, indent=2))
+        return report
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; stages cost one context switch."""
+
+    @contextmanager
+    def stage(self, name: str, index=None) -> Iterator[StageRecord]:
+        yield StageRecord()
+
+
+NULL_PROFILER = NullProfiler()
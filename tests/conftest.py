@@ -0,0 +1,16 @@
+import fitz
+import pytest
+
+BODY = "Some body text on the page.\n" * 20
+
+
+@pytest.fixture
+def book(tmp_path):
+    """A small text PDF of three five-page chapters."""
+    path = tmp_path / "book.pdf"
+    with fitz.open() as doc:
+        for page_num in range(15):
+            heading = f"CHAPTER {page_num // 5 + 1}\n\n" if page_num % 5 == 0 else ""
+            doc.new_page().insert_text((72, 72), heading + BODY)
+        doc.save(path)
+    return path
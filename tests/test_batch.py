@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from pdfsplitter import batch
+from pdfsplitter.batch import discover_inputs, run_batch
+from pdfsplitter.core import ocr_detector, session
+from pdfsplitter.utils import fingerprint
+
+
+def touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+    return path
+
+
+def test_discover_inputs_skips_earlier_split_output(tmp_path):
+    book = touch(tmp_path / "book.pdf")
+    nested = touch(tmp_path / "shelf" / "novel.epub")
+    touch(tmp_path / "book_output" / "chapter_01.pdf")
+    touch(tmp_path / "shelf" / "novel_output" / "chapter_01.epub")
+
+    assert discover_inputs(tmp_path) == [book, nested]
+
+
+def test_discover_inputs_searches_other_output_named_folders(tmp_path):
+    talk = touch(tmp_path / "conference_output" / "talk.pdf")
+    # No book.pdf next to it, so this is not a split's default output.
+    paper = touch(tmp_path / "book_output" / "paper.pdf")
+
+    assert discover_inputs(tmp_path) == [paper, talk]
+
+
+def test_discover_inputs_skips_directories_with_split_metadata(tmp_path):
+    book = touch(tmp_path / "book.pdf")
+    touch(tmp_path / "chapters" / "chapter_01.pdf")
+    (tmp_path / "chapters" / "metadata.json").write_text(
+        json.dumps({"original_file": str(book), "chapters": []})
+    )
+    # Unrelated metadata.json files do not hide a directory.
+    other = touch(tmp_path / "papers" / "paper.pdf")
+    (tmp_path / "papers" / "metadata.json").write_text(json.dumps({"tags": []}))
+
+    assert discover_inputs(tmp_path) == [book, other]
+
+
+def test_discover_inputs_skips_output_root(tmp_path):
+    book = touch(tmp_path / "book.pdf")
+    touch(tmp_path / "out" / "book" / "chapter_01.pdf")
+
+    assert discover_inputs(tmp_path, tmp_path / "out") == [book]
+
+
+def test_discover_inputs_keeps_ocr_suffixed_books(tmp_path):
+    book = touch(tmp_path / "protocol_ocr.pdf")
+
+    assert discover_inputs(tmp_path) == [book]
+
+
+def test_batch_hashes_each_book_once(book, tmp_path, monkeypatch):
+    hashed = []
+
+    def file_sha256(path, *args):
+        hashed.append(Path(path))
+        return fingerprint.file_sha256(path, *args)
+
+    for module in (batch, ocr_detector, session):
+        monkeypatch.setattr(module, "file_sha256", file_sha256)
+    monkeypatch.setattr(batch.settings, "CACHE_DIR", tmp_path / "cache")
+
+    summary = run_batch(
+        [book], tmp_path / "manifest.jsonl", tmp_path / "out", cache_backend="json"
+    )
+    assert summary.processed == 1
+    assert hashed == [book]
@@ -0,0 +1,72 @@
+import multiprocessing
+import sys
+from types import SimpleNamespace
+import pytest
+from pdfsplitter.utils import cache as cache_module
+from pdfsplitter.utils.cache import SQLiteCache
+
+VALUE = {"text": "x" * 90}
+SIZE = len('{"text": ""}') + 90
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Every call moves one second on, so access order is never a tie.
+    now = SimpleNamespace(value=1000.0)
+
+    def time():
+        now.value += 1
+        return now.value
+
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(time=time))
+    return now
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path, clock):
+    cache = SQLiteCache(tmp_path, max_bytes=3 * SIZE)
+    for key in ("a", "b", "c"):
+        cache.set(key, VALUE)
+    cache.get("a")
+
+    cache.set("d", VALUE)
+    assert cache.get("b") is None
+    assert all(cache.get(key) == VALUE for key in ("a", "c", "d"))
+
+    cache.set("e", VALUE)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 3 * SIZE
+
+
+def test_hits_and_misses_are_counted(tmp_path, clock):
+    cache = SQLiteCache(tmp_path, ttl_seconds=10)
+    assert cache.get("missing") is None
+    cache.set("key", VALUE)
+    assert cache.get("key") == VALUE
+    assert cache.get("key") == VALUE
+
+    clock.value += 60
+    assert cache.get("key") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 0)
+
+
+def _use_in_child(cache: SQLiteCache):
+    cache.set("child", VALUE)
+    sys.exit(0 if cache.get("parent") == VALUE else 1)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs fork")
+def test_processes_share_one_cache(tmp_path):
+    cache = SQLiteCache(tmp_path)
+    cache.set("parent", VALUE)
+
+    # The forked child inherits the open connection and must open its own.
+    child = multiprocessing.get_context("fork").Process(
+        target=_use_in_child, args=(cache,)
+    )
+    child.start()
+    child.join()
+
+    assert child.exitcode == 0
+    assert cache.get("child") == VALUE
@@ -0,0 +1,180 @@
+import itertools
+import re
+import pytest
+from pdfsplitter.constants import (
+    CHAPTER_HEADING_PATTERNS,
+    CHAPTER_IGNORE_PATTERNS,
+    PART_HEADING_PATTERNS,
+    POSTTEXT_HEADING_PATTERNS,
+    POSTTEXT_MARKER_PATTERNS,
+    ROMAN_CHAPTER_PATTERNS,
+    TOC_ENTRY_PATTERNS,
+    TOC_HEADER_PATTERNS,
+)
+from pdfsplitter.core.heading_rules import (
+    DEFAULT_RULE_SETS,
+    EXTRA_RULE_SETS,
+    HeadingRules,
+    RuleSet,
+)
+
+# The per-pattern matchers that HeadingRules replaced, as pdf_processor
+# applied them to stripped header lines.
+
+
+def old_is_ignored(line):
+    return any(p.match(line.strip()) for p in CHAPTER_IGNORE_PATTERNS)
+
+
+def old_is_chapter(line, patterns=CHAPTER_HEADING_PATTERNS):
+    return not old_is_ignored(line) and any(p.match(line) for p in patterns)
+
+
+def old_is_posttext(line):
+    return any(p.search(line) for p in POSTTEXT_MARKER_PATTERNS) or any(
+        p.match(line) for p in POSTTEXT_HEADING_PATTERNS
+    )
+
+
+def old_is_toc_header(text):
+    return any(p.search(text) for p in TOC_HEADER_PATTERNS)
+
+
+def old_match_toc_entry(line):
+    for pattern in TOC_ENTRY_PATTERNS:
+        match = pattern.match(line)
+        if match:
+            return match.group(1, 2, 3)
+    return None
+
+
+HEADS = [
+    "",
+    "CHAPTER",
+    "Chapter",
+    "chapter",
+    "PART",
+    "Part",
+    "APPENDIX",
+    "Appendix",
+    "References",
+    "REFERENCE",
+    "Bibliography",
+    "index",
+    "Index of Chapters",
+    "Notes",
+    "note",
+    "Glossary",
+    "Afterword",
+    "EPILOGUE",
+    "Acknowledgment",
+    "Contents",
+    "Table of Contents",
+    "table  of contents",
+    "Chapters",
+    "1.",
+    "12",
+    "3",
+]
+MIDDLES = [
+    "",
+    " ",
+    " 1",
+    " 12",
+    " IV",
+    " xiv",
+    " A",
+    " b",
+    " B.",
+    " Title",
+    " Title of the chapter",
+    " Title ... 45",
+    " Title.... 45",
+    ": A Title page 12",
+    " A Title ..+. 5",
+    " x 3",
+]
+TAILS = ["", " ", "\t", " 23", ".", " page 4", "s"]
+
+LINES = sorted(
+    {"".join(parts).strip() for parts in itertools.product(HEADS, MIDDLES, TAILS)}
+)
+
+
+@pytest.fixture
+def rules():
+    return HeadingRules(DEFAULT_RULE_SETS)
+
+
+def test_corpus_covers_every_kind(rules):
+    kinds = {rules.classify(line) for line in LINES}
+    assert kinds == {None, "ignore", "chapter", "posttext"}
+    assert any(rules.match_toc_entry(line) for line in LINES)
+
+
+def test_classify_matches_old_matchers(rules):
+    for line in LINES:
+        kind = rules.classify(line)
+        assert (kind == "ignore") == old_is_ignored(line), line
+        assert (kind == "chapter") == old_is_chapter(line), line
+        assert (kind == "posttext") == old_is_posttext(line), line
+
+
+def test_toc_header_matches_old_matchers(rules):
+    for line in LINES:
+        text = line.lower()
+        assert rules.is_toc_header(text) == old_is_toc_header(text), line
+
+
+def test_match_toc_entry_matches_old_matchers(rules):
+    for line in LINES:
+        assert rules.match_toc_entry(line) == old_match_toc_entry(line), line
+
+
+def test_match_toc_entry_uses_first_matching_pattern(rules):
+    # Both of the first two patterns match; the first keeps the dots out.
+    assert rules.match_toc_entry("3. Neural Networks.... 45") == (
+        "3",
+        "Neural Networks",
+        "45",
+    )
+
+
+def test_match_toc_entry_groups_follow_registered_patterns(rules):
+    rules.register(
+        RuleSet(
+            "dash", "toc_entry", (re.compile(r"^Ch\.\s*(\d+)\s+-\s+(.+?)\s+(\d+)$"),)
+        )
+    )
+    assert rules.match_toc_entry("Ch. 4 - Optimisation 88") == (
+        "4",
+        "Optimisation",
+        "88",
+    )
+    assert rules.match_toc_entry("4. Optimisation 88") == ("4", "Optimisation", "88")
+
+
+@pytest.mark.parametrize("name", list(EXTRA_RULE_SETS))
+def test_extra_rule_sets_match_old_matchers(name):
+    rules = HeadingRules(DEFAULT_RULE_SETS + (EXTRA_RULE_SETS[name],))
+    extra = {"roman": ROMAN_CHAPTER_PATTERNS, "part": PART_HEADING_PATTERNS}[name]
+    for line in LINES:
+        expected = old_is_chapter(line, CHAPTER_HEADING_PATTERNS + extra)
+        assert (rules.classify(line) == "chapter") == expected, line
+
+
+def test_ignore_wins_over_chapter():
+    rules = HeadingRules(
+        DEFAULT_RULE_SETS + (RuleSet("skip_13", "ignore", (r"CHAPTER 13$",)),)
+    )
+    assert rules.classify("CHAPTER 13") == "ignore"
+    assert rules.classify("CHAPTER 12") == "chapter"
+
+
+def test_patterns_keep_their_own_flags(rules):
+    # Ignore patterns are case-sensitive, chapter patterns are not; the
+    # combined regex must not carry one's flags over to the other.
+    assert rules.classify("chapter 7") == "chapter"
+    assert rules.classify("1. B.") == "ignore"
+    assert rules.classify("1. b.") is None
+    assert rules.match_toc_entry("chapter 2: Basics page 9") == ("2", "Basics", "9")
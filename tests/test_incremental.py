@@ -0,0 +1,89 @@
+import json
+import pytest
+from pdfsplitter.core import split_pdf
+
+NAMES = ["chapter_01.pdf", "chapter_02.pdf", "chapter_03.pdf"]
+
+
+@pytest.fixture
+def out(book, tmp_path):
+    out = tmp_path / "out"
+    split_pdf(book, out)
+    assert sorted(p.name for p in out.glob("*.pdf")) == NAMES
+    return out
+
+
+def inodes(out):
+    return {name: (out / name).stat().st_ino for name in NAMES}
+
+
+def edit_metadata(out, edit):
+    path = out / "metadata.json"
+    metadata = json.loads(path.read_text())
+    edit(metadata)
+    path.write_text(json.dumps(metadata))
+
+
+def test_unchanged_chapters_are_kept(book, out):
+    before = inodes(out)
+    split_pdf(book, out)
+    assert inodes(out) == before
+
+
+def test_changed_range_is_rewritten(book, out):
+    before = inodes(out)
+
+    def shift(metadata):
+        metadata["chapters"][1]["end_page"] += 1
+
+    edit_metadata(out, shift)
+    split_pdf(book, out)
+    after = inodes(out)
+    assert after["chapter_02.pdf"] != before["chapter_02.pdf"]
+    assert after["chapter_01.pdf"] == before["chapter_01.pdf"]
+    assert after["chapter_03.pdf"] == before["chapter_03.pdf"]
+
+
+def test_stale_file_is_removed(book, out):
+    (out / "chapter_04.pdf").write_bytes(b"old")
+
+    def add(metadata):
+        metadata["chapters"].append({"file_name": "chapter_04.pdf"})
+
+    edit_metadata(out, add)
+    split_pdf(book, out)
+    assert not (out / "chapter_04.pdf").exists()
+
+
+def test_leftover_partial_is_removed(book, out):
+    partial = out / ".chapter_02.pdf.partial"
+    partial.write_bytes(b"half")
+    split_pdf(book, out)
+    assert not partial.exists()
+
+
+def test_stale_names_stay_inside_output_dir(book, out, tmp_path):
+    victim = tmp_path / "victim.txt"
+    victim.write_text("keep me")
+
+    def escape(metadata):
+        metadata["chapters"].append({"file_name": "../victim.txt"})
+
+    edit_metadata(out, escape)
+    split_pdf(book, out)
+    assert victim.exists()
+
+
+def test_epub_split_in_same_directory_is_left_alone(book, tmp_path):
+    out = tmp_path / "book_output"
+    out.mkdir()
+    xhtml = out / "chapter_01.xhtml"
+    xhtml.write_text("<html/>")
+    metadata = {
+        "original_file": str(tmp_path / "book.epub"),
+        "chapters": [{"file_name": xhtml.name, "file_path": str(xhtml)}],
+    }
+    (out / "metadata.json").write_text(json.dumps(metadata))
+
+    split_pdf(book, out)
+    assert xhtml.exists()
@@ -0,0 +1,16 @@
+from pdfsplitter.core import load_split_index, materialize_chapter, split_pdf
+
+
+def test_index_from_relative_path_materializes_elsewhere(book, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    split_pdf(book.name, "out", index_only=True)
+
+    elsewhere = tmp_path / "elsewhere"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    index = load_split_index(tmp_path / "out")
+    assert index.source == book
+
+    path = materialize_chapter(tmp_path / "out", "CHAPTER 2")
+    assert path == tmp_path / "out" / "chapter_02.pdf"
+    assert path.stat().st_size > 0
@@ -0,0 +1,59 @@
+import fitz
+import pytest
+from pdfsplitter.core.page_index import PageTextIndex
+from pdfsplitter.core.pdf_processor import detect_chapter_candidates
+from pdfsplitter.core.session import DocumentSession
+
+BODY = "\n".join(f"Line {n} of body text on this page." for n in range(1, 31))
+
+
+@pytest.fixture
+def running_header_pdf(tmp_path):
+    # 60 pages with a running header at the top of every page and a
+    # chapter heading every 10 pages, set below the header region.
+    path = tmp_path / "running_header.pdf"
+    with fitz.open() as doc:
+        for page_num in range(60):
+            page = doc.new_page()
+            page.insert_text((72, 36), "A Book With Running Headers")
+            if page_num % 10 == 0:
+                page.insert_text((72, 340), f"CHAPTER {page_num // 10 + 1}\n\n{BODY}")
+            else:
+                page.insert_text((72, 110), BODY)
+        doc.save(path)
+    return path
+
+
+def test_head_lines_see_heading_below_running_header(running_header_pdf):
+    with fitz.open(running_header_pdf) as doc:
+        index = PageTextIndex(doc)
+        assert "CHAPTER 2" in index.head_lines(10)
+
+
+def test_chapters_below_running_header_are_detected(running_header_pdf):
+    with DocumentSession(running_header_pdf) as session:
+        candidates = detect_chapter_candidates(session)
+    assert [(c.title, c.page_num) for c in candidates] == [
+        (f"CHAPTER {n}", (n - 1) * 10) for n in range(1, 7)
+    ]
+
+
+def test_running_header_is_dropped_from_head_lines(running_header_pdf):
+    with fitz.open(running_header_pdf) as doc:
+        index = PageTextIndex(doc)
+        assert index.running_header() == "A Book With Running Headers"
+        assert index.head_lines(11)[0] == "Line 1 of body text on this page."
+
+
+def test_region_reads_fewer_full_pages(running_header_pdf, book):
+    for path in (running_header_pdf, book):
+        found, full_reads = {}, {}
+        for region in ("clipped", None):
+            with DocumentSession(path) as session:
+                if region is None:
+                    session.pages.header_region = None
+                candidates = detect_chapter_candidates(session)
+                found[region] = [(c.title, c.page_num) for c in candidates]
+                full_reads[region] = session.pages.full_reads
+        assert found["clipped"] == found[None]
+        assert full_reads["clipped"] < full_reads[None] / 2
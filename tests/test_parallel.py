@@ -0,0 +1,31 @@
+import os
+from pdfsplitter.utils.parallel import iter_largest_first
+
+
+def open_log(path):
+    return path
+
+
+def record(log, item):
+    with open(log, "a") as f:
+        f.write(f"{os.getpid()} {item}\n")
+
+
+def test_every_item_runs_once_and_is_yielded(tmp_path):
+    log = tmp_path / "log"
+    items = [3, 1, 4, 1.5, 9, 2, 6]
+    done = list(
+        iter_largest_first(
+            items,
+            size=lambda item: item,
+            work=record,
+            args=lambda item: (item,),
+            jobs=1,
+            open_resource=open_log,
+            resource_args=(log,),
+        )
+    )
+    assert sorted(done) == sorted(items)
+    # One worker runs the items in the order they were handed out.
+    lines = log.read_text().split("\n")[:-1]
+    assert [float(line.split()[1]) for line in lines] == sorted(items, reverse=True)
@@ -0,0 +1,52 @@
+import json
+import shutil
+import fitz
+import pytest
+from pdfsplitter.core import ocr_runner
+from pdfsplitter.pipeline import process_file
+
+
+@pytest.fixture
+def plates(book, tmp_path):
+    # A scanned plate in the middle of a text book: the first pages pass
+    # the needs_ocr sample, but pages mode must still OCR the plate.
+    path = tmp_path / "books" / "plates.pdf"
+    path.parent.mkdir()
+    with fitz.open(book) as doc:
+        plate = doc.new_page()
+        plate.insert_image(plate.rect, pixmap=fitz.Pixmap(fitz.csRGB, (0, 0, 8, 8)))
+        doc.move_page(len(doc) - 1, 7)
+        doc.save(path)
+    return path
+
+
+def test_pages_mode_finds_scan_past_the_sample(plates, tmp_path, monkeypatch):
+    ocred = []
+
+    def run_ocr_on_pages(input_path, output_path, pages, jobs=None):
+        ocred.extend(pages)
+        return False
+
+    monkeypatch.setattr(ocr_runner, "run_ocr_on_pages", run_ocr_on_pages)
+    process_file(plates, tmp_path / "out", ocr_mode="pages")
+    assert ocred == [7]
+
+
+def test_index_only_keeps_ocr_output_in_output_dir(plates, tmp_path, monkeypatch):
+    def run_ocr_on_pages(input_path, output_path, pages, jobs=None):
+        shutil.copy(input_path, output_path)
+        return True
+
+    monkeypatch.setattr(ocr_runner, "run_ocr_on_pages", run_ocr_on_pages)
+    out = tmp_path / "out"
+    process_file(plates, out, ocr_mode="pages", index_only=True)
+
+    assert list(plates.parent.iterdir()) == [plates]
+    metadata = json.loads((out / "metadata.json").read_text())
+    assert metadata["original_file"] == str(out / "plates_ocr.pdf")
+    assert (out / "plates_ocr.pdf").exists()
+
+
+def test_unknown_option_is_rejected(book, tmp_path):
+    with pytest.raises(TypeError):
+        process_file(book, tmp_path / "out", page_windw=10)
@@ -0,0 +1,25 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from pdfsplitter.server import SplitService, WorkersUnavailable
+
+
+@pytest.fixture
+def service():
+    service = SplitService(workers=1, queue_size=2, cache_backend=None)
+    yield service
+    service.shutdown()
+
+
+def test_submit_after_worker_death_restarts_pool(service, book, tmp_path):
+    with pytest.raises(BrokenProcessPool):
+        service.pool.submit(os._exit, 1).result()
+
+    request = {"input": str(book), "output_dir": str(tmp_path / "out")}
+    with pytest.raises(WorkersUnavailable):
+        service.submit(request)
+    # The refused job is not left queued, holding its output directory.
+    assert service.jobs == {}
+
+    job = service.submit(request)
+    assert job.future.result(timeout=60)["status"] == "done"